@@ -11,7 +11,8 @@ from app.models import (
     loan,
     lender,
     policy,
-    match
+    match,
+    idempotency
 )
 from app.core.config import settings
 from logging.config import fileConfig
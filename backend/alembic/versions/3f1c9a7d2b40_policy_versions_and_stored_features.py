@@ -0,0 +1,32 @@
+"""policy versions and stored feature vectors
+
+Revision ID: 3f1c9a7d2b40
+Revises: e654d5aacb16
+Create Date: 2026-10-18 10:12:31.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b40'
+down_revision: Union[str, Sequence[str], None] = 'e654d5aacb16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('lender_program', sa.Column('policy_version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('match_result', sa.Column('policy_version', sa.Integer(), nullable=True))
+    op.add_column('loan_request', sa.Column('features', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('loan_request', 'features')
+    op.drop_column('match_result', 'policy_version')
+    op.drop_column('lender_program', 'policy_version')
@@ -0,0 +1,42 @@
+"""add foreign key and filter indexes
+
+Revision ID: 8a2e5c1f7d93
+Revises: 3f1c9a7d2b40
+Create Date: 2026-10-18 11:03:47.918254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a2e5c1f7d93'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7d2b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_business_created_at'), 'business', ['created_at'], unique=False)
+    op.create_index(op.f('ix_personal_guarantor_business_id'), 'personal_guarantor', ['business_id'], unique=False)
+    op.create_index(op.f('ix_business_credit_business_id'), 'business_credit', ['business_id'], unique=False)
+    op.create_index(op.f('ix_loan_request_business_id'), 'loan_request', ['business_id'], unique=False)
+    op.create_index(op.f('ix_lender_program_lender_id'), 'lender_program', ['lender_id'], unique=False)
+    op.create_index(op.f('ix_policy_criteria_program_id'), 'policy_criteria', ['program_id'], unique=False)
+    op.create_index('ix_match_result_loan_request_eligible_fit', 'match_result', ['loan_request_id', 'eligible', 'fit_score'], unique=False)
+    op.create_index(op.f('ix_match_result_program_id'), 'match_result', ['program_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_match_result_program_id'), table_name='match_result')
+    op.drop_index('ix_match_result_loan_request_eligible_fit', table_name='match_result')
+    op.drop_index(op.f('ix_policy_criteria_program_id'), table_name='policy_criteria')
+    op.drop_index(op.f('ix_lender_program_lender_id'), table_name='lender_program')
+    op.drop_index(op.f('ix_loan_request_business_id'), table_name='loan_request')
+    op.drop_index(op.f('ix_business_credit_business_id'), table_name='business_credit')
+    op.drop_index(op.f('ix_personal_guarantor_business_id'), table_name='personal_guarantor')
+    op.drop_index(op.f('ix_business_created_at'), table_name='business')
@@ -0,0 +1,28 @@
+"""idempotency key request hash
+
+Revision ID: 9d3a7f5e2c18
+Revises: f2b8e61d4c07
+Create Date: 2026-10-18 16:20:11.604392
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3a7f5e2c18'
+down_revision: Union[str, Sequence[str], None] = 'f2b8e61d4c07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('idempotency_key', sa.Column('request_hash', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('idempotency_key', 'request_hash')
@@ -0,0 +1,30 @@
+"""loan request match status
+
+Revision ID: a61f4d8e3b92
+Revises: 5b7e0c9a4d21
+Create Date: 2026-10-18 18:05:12.448310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a61f4d8e3b92'
+down_revision: Union[str, Sequence[str], None] = '5b7e0c9a4d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('loan_request', sa.Column('match_status', sa.String(), nullable=True))
+    op.add_column('loan_request', sa.Column('match_error', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('loan_request', 'match_error')
+    op.drop_column('loan_request', 'match_status')
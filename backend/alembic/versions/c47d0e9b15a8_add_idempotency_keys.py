@@ -0,0 +1,36 @@
+"""add idempotency keys
+
+Revision ID: c47d0e9b15a8
+Revises: 8a2e5c1f7d93
+Create Date: 2026-10-18 11:41:05.227390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47d0e9b15a8'
+down_revision: Union[str, Sequence[str], None] = '8a2e5c1f7d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('idempotency_key',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('business_id', sa.String(), nullable=False),
+    sa.Column('loan_request_id', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['business_id'], ['business.id'], ),
+    sa.ForeignKeyConstraint(['loan_request_id'], ['loan_request.id'], ),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('idempotency_key')
@@ -0,0 +1,32 @@
+"""match attempts and idempotency key expiry
+
+Revision ID: d83b2f6a0c45
+Revises: a61f4d8e3b92
+Create Date: 2026-10-18 18:42:27.106935
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd83b2f6a0c45'
+down_revision: Union[str, Sequence[str], None] = 'a61f4d8e3b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('loan_request', sa.Column('match_attempt', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('loan_request', sa.Column('match_updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_idempotency_key_created_at'), 'idempotency_key', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_idempotency_key_created_at'), table_name='idempotency_key')
+    op.drop_column('loan_request', 'match_updated_at')
+    op.drop_column('loan_request', 'match_attempt')
@@ -0,0 +1,30 @@
+"""business filter indexes
+
+Revision ID: e4a7c2d91f36
+Revises: d83b2f6a0c45
+Create Date: 2026-10-18 19:20:44.583102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a7c2d91f36'
+down_revision: Union[str, Sequence[str], None] = 'd83b2f6a0c45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_business_state_created_at', 'business', ['state', 'created_at', 'id'], unique=False)
+    op.create_index('ix_business_industry_created_at', 'business', ['industry', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_business_industry_created_at', table_name='business')
+    op.drop_index('ix_business_state_created_at', table_name='business')
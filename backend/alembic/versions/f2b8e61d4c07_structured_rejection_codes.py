@@ -0,0 +1,167 @@
+"""structured rejection codes
+
+Revision ID: f2b8e61d4c07
+Revises: c47d0e9b15a8
+Create Date: 2026-10-18 14:02:47.518203
+
+Rewrites match_result.rejection_reasons from message strings to the codes
+described in app/services/rejections.py. A message is matched back to its
+criterion by formatting the program's current criteria the way the engine
+did; messages that match nothing (the criterion has since been replaced)
+are left as strings, which the API still returns as they are.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8e61d4c07'
+down_revision: Union[str, Sequence[str], None] = 'c47d0e9b15a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+AMOUNT_MIN = "amount_min"
+AMOUNT_MAX = "amount_max"
+TOO_LOW = "Loan amount too low"
+TOO_HIGH = "Loan amount too high"
+
+# Feature vector slot order at this revision (app/services/features.py)
+SLOT = {name: i for i, name in enumerate((
+    "fico_score", "years_in_business", "annual_revenue", "industry", "state", "equipment_year",
+    "equipment_age", "bankruptcy", "years_since_bankruptcy", "paynet_score", "trade_lines",
+    "equipment_type", "loan_amount",
+))}
+
+match_result = sa.table(
+    'match_result',
+    sa.column('id', sa.String),
+    sa.column('loan_request_id', sa.String),
+    sa.column('program_id', sa.String),
+    sa.column('eligible', sa.Boolean),
+    sa.column('rejection_reasons', sa.JSON),
+)
+loan_request = sa.table(
+    'loan_request',
+    sa.column('id', sa.String),
+    sa.column('amount', sa.Numeric),
+    sa.column('features', sa.JSON),
+)
+lender_program = sa.table(
+    'lender_program',
+    sa.column('id', sa.String),
+    sa.column('min_loan_amount', sa.Numeric),
+    sa.column('max_loan_amount', sa.Numeric),
+)
+policy_criteria = sa.table(
+    'policy_criteria',
+    sa.column('id', sa.String),
+    sa.column('program_id', sa.String),
+    sa.column('criteria_type', sa.String),
+    sa.column('operator', sa.String),
+    sa.column('value', sa.JSON),
+)
+
+
+def _message(criteria_type, operator, value) -> str:
+    return f"Failed {criteria_type} check: {operator} {value}"
+
+
+def _criteria(conn):
+    return conn.execute(sa.select(
+        policy_criteria.c.id, policy_criteria.c.program_id, policy_criteria.c.criteria_type,
+        policy_criteria.c.operator, policy_criteria.c.value
+    )).all()
+
+
+def _rewrite(conn, convert) -> None:
+    """Apply ``convert(reasons, program_id, amount, features)`` to every rejected row, in id order."""
+    update = (
+        sa.update(match_result)
+        .where(match_result.c.id == sa.bindparam('row_id'))
+        .values(rejection_reasons=sa.bindparam('reasons', type_=sa.JSON))
+    )
+    cursor = None
+    while True:
+        query = (
+            sa.select(match_result.c.id, match_result.c.program_id, match_result.c.rejection_reasons,
+                      loan_request.c.amount, loan_request.c.features)
+            .select_from(match_result.outerjoin(loan_request, loan_request.c.id == match_result.c.loan_request_id))
+            .where(match_result.c.eligible == sa.false())
+            .order_by(match_result.c.id)
+            .limit(BATCH_SIZE)
+        )
+        if cursor is not None:
+            query = query.where(match_result.c.id > cursor)
+        rows = conn.execute(query).all()
+        if not rows:
+            break
+        cursor = rows[-1].id
+
+        changed = []
+        for row in rows:
+            if not row.rejection_reasons:
+                continue
+            reasons = convert(row.rejection_reasons, row.program_id, row.amount, row.features)
+            if reasons != row.rejection_reasons:
+                changed.append({'row_id': row.id, 'reasons': reasons})
+        if changed:
+            conn.execute(update, changed)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    by_message = {}
+    for c in _criteria(conn):
+        by_message.setdefault(c.program_id, {})[_message(c.criteria_type, c.operator, c.value)] = (
+            c.id, SLOT.get(c.criteria_type)
+        )
+
+    def convert(reasons, program_id, amount, features):
+        amount = float(amount) if amount is not None else None
+        codes = []
+        for reason in reasons:
+            if not isinstance(reason, str):
+                codes.append(reason)
+            elif reason.startswith(TOO_LOW):
+                codes.append([AMOUNT_MIN, amount])
+            elif reason.startswith(TOO_HIGH):
+                codes.append([AMOUNT_MAX, amount])
+            elif reason in by_message.get(program_id, {}):
+                criterion_id, slot = by_message[program_id][reason]
+                observed = features[slot] if features and slot is not None else None
+                codes.append([criterion_id, observed])
+            else:
+                codes.append(reason)
+        return codes
+
+    _rewrite(conn, convert)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    criteria = {c.id: _message(c.criteria_type, c.operator, c.value) for c in _criteria(conn)}
+    programs = {p.id: p for p in conn.execute(sa.select(
+        lender_program.c.id, lender_program.c.min_loan_amount, lender_program.c.max_loan_amount
+    ))}
+
+    def convert(reasons, program_id, amount, features):
+        program = programs.get(program_id)
+        messages = []
+        for reason in reasons:
+            if isinstance(reason, str):
+                messages.append(reason)
+            elif reason[0] == AMOUNT_MIN:
+                messages.append(f"{TOO_LOW} (Min: {program.min_loan_amount})" if program else TOO_LOW)
+            elif reason[0] == AMOUNT_MAX:
+                messages.append(f"{TOO_HIGH} (Max: {program.max_loan_amount})" if program else TOO_HIGH)
+            else:
+                messages.append(criteria.get(reason[0], "Failed a policy check that has since changed"))
+        return messages
+
+    _rewrite(conn, convert)
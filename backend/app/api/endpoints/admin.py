@@ -0,0 +1,63 @@
+import threading
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import Optional
+from app.core.database import SessionLocal
+from app.services.match_cache import match_cache
+from app.services.response_cache import response_cache
+from app.services.rematch import RematchProgress, run_rematch
+
+router = APIRouter()
+
+# Matching processes a single API-triggered run may start
+MAX_REMATCH_WORKERS = 32
+
+class RematchRequest(BaseModel):
+    workers: int = Field(4, ge=1, le=MAX_REMATCH_WORKERS)
+    chunk_size: int = Field(500, ge=1, le=100000)
+    start_after: Optional[str] = None
+    end_at: Optional[str] = None
+
+# Only one re-match run per API process at a time
+_rematch_lock = threading.Lock()
+_rematch_progress: Optional[RematchProgress] = None
+
+def _run_in_background(request: RematchRequest, progress: RematchProgress):
+    db = SessionLocal()
+    try:
+        run_rematch(
+            db,
+            workers=request.workers,
+            chunk_size=request.chunk_size,
+            start_after=request.start_after,
+            end_at=request.end_at,
+            progress=progress
+        )
+    except Exception:
+        pass  # Recorded on progress.error
+    finally:
+        db.close()
+        _rematch_lock.release()
+
+@router.post("/rematch", status_code=202)
+def start_rematch(request: RematchRequest):
+    global _rematch_progress
+    if not _rematch_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A re-match run is already in progress")
+    _rematch_progress = RematchProgress()
+    threading.Thread(target=_run_in_background, args=(request, _rematch_progress), daemon=True).start()
+    return _rematch_progress.to_dict()
+
+@router.get("/rematch")
+def get_rematch_progress():
+    if _rematch_progress is None:
+        raise HTTPException(status_code=404, detail="No re-match run has been started")
+    return _rematch_progress.to_dict()
+
+@router.get("/match-cache")
+def get_match_cache_stats():
+    return match_cache.stats()
+
+@router.get("/response-cache")
+def get_response_cache_stats():
+    return response_cache.stats()
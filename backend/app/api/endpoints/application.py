@@ -1,15 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from app.core.database import SessionLocal
-from app.schemas.application import ApplicationCreate, ApplicationResponse
+import base64
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload, selectinload
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, SessionLocal
+from app.core.profiling import run_in_threadpool
+from app.schemas.application import ApplicationCreate, ApplicationFilters, ApplicationResponse
 from app.models.business import Business
 from app.models.personal_guarantor import PersonalGuarantor
 from app.models.business_credit import BusinessCredit
 from app.models.loan import LoanRequest
-from app.models.lender import Lender, LenderProgram
+from app.models.idempotency import IdempotencyKey
+from app.services.features import extract_features
+from app.services.match_writer import bulk_insert_match_results
 from app.services.matching_engine import MatchingEngine
+from app.services.policy_snapshot import get_policy_snapshot
+from app.services import rejections
+from app.services.match_jobs import (
+    match_jobs, DONE, FAILED, PENDING, RUNNING, SETTLED, claim_match, is_stale, set_match_status, stored_status
+)
+from app.services.response_cache import APPLICATION, MATCHES, response_cache
 from app.schemas.match import MatchResultResponse
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from app.models.match import MatchResult
 
@@ -22,30 +41,229 @@ def get_db():
     finally:
         db.close()
 
-def _fetch_matches_for_loan_request(db: Session, loan_request_id: str) -> List[MatchResultResponse]:
-    db_matches = db.query(MatchResult).options(
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Loads a page of applications with everything the response needs in a fixed
+# number of queries, however many applications are on the page
+APPLICATION_GRAPH = (
+    selectinload(Business.guarantor),
+    selectinload(Business.business_credit),
+    selectinload(Business.loan_request).selectinload(LoanRequest.matches).options(
         joinedload(MatchResult.lender),
         joinedload(MatchResult.program)
-    ).filter(MatchResult.loan_request_id == loan_request_id).all()
-    
-    matches = []
-    for r in db_matches:
-        matches.append(MatchResultResponse(
-            lender_name=r.lender.name if r.lender else "Unknown",
-            program_name=r.program.name if r.program else "Unknown",
-            eligible=r.eligible,
-            fit_score=r.fit_score,
-            rejection_reasons=r.rejection_reasons
+    ),
+)
+
+def _match_response(r: MatchResult, criteria: Dict[str, Any]) -> MatchResultResponse:
+    # criteria: rejection_reasons' criteria by id, see rejections.load_criteria
+    return MatchResultResponse(
+        lender_name=r.lender.name if r.lender else "Unknown",
+        program_name=r.program.name if r.program else "Unknown",
+        eligible=r.eligible,
+        fit_score=r.fit_score,
+        rejection_reasons=rejections.render(r.rejection_reasons, r.program, criteria)
+    )
+
+def _application_response(b: Business, criteria: Dict[str, Any]) -> dict:
+    loan_req = b.loan_request
+    return {
+        "id": b.id,
+        "created_at": b.created_at,
+        "business": b,
+        "guarantor": b.guarantor,
+        "business_credit": b.business_credit,
+        "loan_request": loan_req,
+        "matches": [_match_response(r, criteria) for r in loan_req.matches] if loan_req else []
+    }
+
+def _rejection_codes(businesses: List[Business]):
+    return [r.rejection_reasons for b in businesses if b.loan_request for r in b.loan_request.matches]
+
+# Upper bound for long-polling GET /{id}/matches
+MAX_MATCH_WAIT_SECONDS = 30.0
+
+def _match_outcome(db: Session, *criteria) -> Optional[dict]:
+    # Stored matching status and matches, with their lender and program names, in
+    # two queries whatever the match count; None when there is no such loan request
+    loan_req = db.query(LoanRequest).options(
+        selectinload(LoanRequest.matches).options(joinedload(MatchResult.lender), joinedload(MatchResult.program))
+    ).filter(*criteria).first()
+    if not loan_req:
+        return None
+    criteria_by_id = rejections.load_criteria(db, [r.rejection_reasons for r in loan_req.matches])
+    return {
+        "status": stored_status(loan_req),
+        "error": loan_req.match_error,
+        "attempt": loan_req.match_attempt,
+        "stale": is_stale(loan_req),
+        "matches": [_match_response(r, criteria_by_id).model_dump() for r in loan_req.matches]
+    }
+
+def _status_response(application_id: str, outcome: dict) -> JSONResponse:
+    # Same body as MatchJob.to_dict, for matching this process holds no job for
+    return JSONResponse(status_code=500 if outcome["status"] == FAILED else 202, content={
+        "job_id": None,
+        "application_id": application_id,
+        "status": outcome["status"],
+        "error": outcome["error"]
+    })
+
+def _request_hash(app_data: ApplicationCreate) -> str:
+    # Ties an Idempotency-Key to the submitted application
+    return hashlib.sha256(app_data.model_dump_json().encode()).hexdigest()
+
+# Expired Idempotency-Key rows are purged at most this often per process
+_KEY_PURGE_SECONDS = 60.0
+_last_key_purge = 0.0
+
+def _key_cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+def _key_expired(key: IdempotencyKey) -> bool:
+    created_at = key.created_at
+    if created_at is None:
+        return False
+    if created_at.tzinfo is None:
+        # SQLite hands timestamps back naive; they are stored in UTC
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at < _key_cutoff()
+
+async def _purge_expired_keys(db: AsyncSession):
+    # Runs in the submit's transaction, so keys only go once it commits
+    global _last_key_purge
+    now = time.monotonic()
+    if now - _last_key_purge < _KEY_PURGE_SECONDS:
+        return
+    _last_key_purge = now
+    await db.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < _key_cutoff()))
+
+def _queue_matching(business_id: str, loan_request_id: str, features, replace: bool = False, attempt: int = 0):
+    # The background job reads the application from its own session, so it must be committed first.
+    # Every status write is conditional on ``attempt``: once a retried submit has taken the
+    # matching over (claim_match) this job's writes, results included, are rolled back.
+    def run(job_db: Session):
+        if not set_match_status(job_db, loan_request_id, RUNNING, attempt=attempt):
+            job_db.rollback()
+            return
+        job_db.commit()
+        try:
+            if replace:
+                job_db.query(MatchResult).filter(MatchResult.loan_request_id == loan_request_id).delete(synchronize_session=False)
+            # Results and the settled status land in one transaction
+            MatchingEngine(job_db).evaluate_features(features, loan_request_id, commit=False)
+            if not set_match_status(job_db, loan_request_id, DONE, attempt=attempt):
+                job_db.rollback()
+                return
+            job_db.commit()
+        except Exception as e:
+            job_db.rollback()
+            set_match_status(job_db, loan_request_id, FAILED, str(e), attempt=attempt)
+            job_db.commit()
+            raise
+        finally:
+            response_cache.invalidate([business_id])
+
+    return match_jobs.submit(business_id, loan_request_id, run)
+
+async def _match_inline(db: AsyncSession, features, business_id: str, loan_request_id: str,
+                        replace: bool = False, attempt: int = 0) -> List[MatchResultResponse]:
+    # Matching is CPU bound; it runs in the threadpool so the event loop keeps serving
+    engine = MatchingEngine(None, await db.run_sync(get_policy_snapshot))
+    results = await run_in_threadpool(engine.match_rows, features, loan_request_id)
+    if replace:
+        await db.execute(delete(MatchResult).where(MatchResult.loan_request_id == loan_request_id))
+    await db.run_sync(bulk_insert_match_results, results)
+    if not await db.run_sync(set_match_status, loan_request_id, DONE, None, attempt):
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Matching of this application was taken over by another request")
+    await db.commit()
+    response_cache.invalidate([business_id])
+
+    # Names come from the policy snapshot the engine evaluated against, no lazy loads
+    programs = {p.id: p for p in engine.snapshot.programs}
+    response = []
+    for r in results:
+        program = programs.get(r["program_id"])
+        response.append(MatchResultResponse(
+            lender_name=program.lender_name if program else "Unknown",
+            program_name=program.name if program else "Unknown",
+            eligible=r["eligible"],
+            fit_score=r["fit_score"],
+            rejection_reasons=rejections.render(r["rejection_reasons"], program, engine.snapshot.criteria_by_id)
         ))
-    return matches
+    return response
+
+async def _replay_submit(db: AsyncSession, key: IdempotencyKey, app_data: ApplicationCreate, sync: bool):
+    # A retried submit gets the original outcome instead of a duplicate application.
+    # Keys stored before request hashes existed can't be checked and are trusted.
+    if key.request_hash is not None and key.request_hash != _request_hash(app_data):
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different application")
 
-@router.post("/submit", response_model=List[MatchResultResponse])
-def submit_application(app_data: ApplicationCreate, db: Session = Depends(get_db)):
-    # 1. Save Data
+    job = match_jobs.for_application(key.business_id)
+    if job and job.status == FAILED:
+        return JSONResponse(status_code=500, content=job.to_dict())
+    if job and job.status != DONE:
+        return JSONResponse(status_code=202, content=job.to_dict())
+    # Matching may belong to another worker; the stored status says how far it got
+    outcome = await db.run_sync(_match_outcome, LoanRequest.id == key.loan_request_id)
+    if outcome["status"] == DONE:
+        return outcome["matches"]
+    if outcome["status"] == FAILED or not outcome["stale"]:
+        return _status_response(key.business_id, outcome)
+
+    # Unsettled for MATCH_STALE_SECONDS: the worker that had the job is gone (evicted
+    # or restarted), so the application is matched again. The claim is conditional,
+    # so of concurrent retries only one re-matches; the others get a 202.
+    if not await db.run_sync(claim_match, key.loan_request_id, outcome["attempt"]):
+        await db.rollback()
+        return _status_response(key.business_id, {"status": PENDING, "error": None})
+    await db.commit()
+    attempt = outcome["attempt"] + 1
+    stored = await db.scalar(select(LoanRequest.features).where(LoanRequest.id == key.loan_request_id))
+    features = tuple(stored) if stored is not None else extract_features(app_data)
+    if not sync:
+        job = _queue_matching(key.business_id, key.loan_request_id, features, replace=True, attempt=attempt)
+        if job is not None:
+            return JSONResponse(status_code=202, content=job.to_dict())
+    return await _match_inline(db, features, key.business_id, key.loan_request_id, replace=True, attempt=attempt)
+
+@router.post("/submit", response_model=List[MatchResultResponse], responses={202: {"description": "Matching queued"}})
+async def submit_application(
+    app_data: ApplicationCreate,
+    sync: bool = True,
+    idempotency_key: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Persist an application and match it.
+
+    By default matching runs inline and the results are returned directly,
+    with the application and its matches written in a single transaction.
+    With ``?sync=false`` matching runs in the background and a 202 with the
+    job id is returned; poll GET /{id}/matches for the results.
+
+    Submits carrying an ``Idempotency-Key`` header already seen return the
+    outcome of the first submit without re-running matching: its results,
+    its job status while matching is pending, or a 500 if matching failed.
+    Matching left unsettled for MATCH_STALE_SECONDS is taken over by one
+    retry and run again.
+    Reusing a key with a different application is a 422. Keys are
+    remembered for IDEMPOTENCY_KEY_TTL_HOURS.
+    """
+    if idempotency_key:
+        await _purge_expired_keys(db)
+        existing = await db.get(IdempotencyKey, idempotency_key)
+        if existing and _key_expired(existing):
+            await db.delete(existing)
+            await db.flush()
+        elif existing:
+            return await _replay_submit(db, existing, app_data, sync)
+
+    # 1. Save Data (ids are assigned client side, a flush makes them visible to the FKs)
     business = Business(**app_data.business.dict())
     db.add(business)
-    db.commit()
-    db.refresh(business)
+    await db.flush()
 
     guarantor = PersonalGuarantor(**app_data.guarantor.dict(), business_id=business.id)
     db.add(guarantor)
@@ -54,103 +272,233 @@ def submit_application(app_data: ApplicationCreate, db: Session = Depends(get_db
         credit = BusinessCredit(**app_data.business_credit.dict(), business_id=business.id)
         db.add(credit)
 
-    loan_req = LoanRequest(**app_data.loan_request.dict(), business_id=business.id)
+    # Stored so a single changed program can later re-score this application
+    features = extract_features(app_data)
+    loan_req = LoanRequest(**app_data.loan_request.dict(), business_id=business.id, features=list(features),
+                           match_status=PENDING, match_updated_at=datetime.now(timezone.utc))
     db.add(loan_req)
-    db.commit()
-    db.refresh(loan_req)
+    await db.flush()
+    business_id, loan_request_id = business.id, loan_req.id
+
+    if idempotency_key:
+        # Claims the key; a concurrent retry that got there first wins and its results are replayed
+        db.add(IdempotencyKey(key=idempotency_key, business_id=business_id, loan_request_id=loan_request_id,
+                              request_hash=_request_hash(app_data)))
+        try:
+            await db.flush()
+        except IntegrityError:
+            await db.rollback()
+            existing = await db.get(IdempotencyKey, idempotency_key)
+            if existing is None:
+                raise
+            return await _replay_submit(db, existing, app_data, sync)
 
     # 2. Run Matching Engine
-    engine = MatchingEngine(db)
-    results = engine.evaluate_application(app_data, loan_req.id)
-    
-    # 3. Format Response
-    response = []
-    for r in results:
-        # r.lender and r.program are already populated by MatchingEngine
-        response.append(MatchResultResponse(
-            lender_name=r.lender.name if r.lender else "Unknown",
-            program_name=r.program.name if r.program else "Unknown",
-            eligible=r.eligible,
-            fit_score=r.fit_score,
-            rejection_reasons=r.rejection_reasons
-        ))
-    
-    return response
+    if not sync:
+        await db.commit()
+        job = _queue_matching(business_id, loan_request_id, features)
+        # A full queue falls through to inline matching rather than dropping the job
+        if job is not None:
+            return JSONResponse(status_code=202, content=job.to_dict())
+
+    # 3. Match, store and format the response
+    return await _match_inline(db, features, business_id, loan_request_id)
+
+@router.post("/eligible", response_model=List[MatchResultResponse])
+async def find_eligible_programs(app_data: ApplicationCreate, db: AsyncSession = Depends(get_async_db)):
+    # Pre-qualification: nothing is stored and only eligible programs are returned
+    engine = MatchingEngine(None, await db.run_sync(get_policy_snapshot))
+    return [
+        MatchResultResponse(
+            lender_name=program.lender_name,
+            program_name=program.name,
+            eligible=result["eligible"],
+            fit_score=result["fit_score"],
+            rejection_reasons=rejections.render(result["rejection_reasons"], program, engine.snapshot.criteria_by_id)
+        )
+        for program, result in await run_in_threadpool(engine.find_eligible, app_data)
+    ]
+
+def _encode_cursor(b: Business) -> str:
+    raw = json.dumps([b.created_at.isoformat(), b.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _after_cursor(query, cursor: str):
+    # Keyset on (created_at, id), newest first: rows strictly after the cursor row
+    created_at, id = _decode_cursor(cursor)
+    return query.filter(or_(
+        Business.created_at < created_at,
+        and_(Business.created_at == created_at, Business.id < id)
+    ))
+
+def _apply_filters(query, filters: ApplicationFilters):
+    # Each filter is a plain predicate or an EXISTS over an indexed foreign key,
+    # so the page query never multiplies rows or pulls matches just to filter
+    if filters.state:
+        query = query.filter(Business.state == filters.state)
+    if filters.industry:
+        query = query.filter(Business.industry == filters.industry)
+    if filters.created_from:
+        query = query.filter(Business.created_at >= filters.created_from)
+    if filters.created_to:
+        query = query.filter(Business.created_at <= filters.created_to)
+
+    if filters.fico_min is not None or filters.fico_max is not None:
+        guarantor = select(PersonalGuarantor.id).where(PersonalGuarantor.business_id == Business.id)
+        if filters.fico_min is not None:
+            guarantor = guarantor.where(PersonalGuarantor.fico_score >= filters.fico_min)
+        if filters.fico_max is not None:
+            guarantor = guarantor.where(PersonalGuarantor.fico_score <= filters.fico_max)
+        query = query.filter(guarantor.exists())
+
+    if filters.eligible_lender_id or filters.eligible_program_id or filters.min_fit_score is not None:
+        match = (
+            select(MatchResult.id)
+            .join(LoanRequest, LoanRequest.id == MatchResult.loan_request_id)
+            .where(LoanRequest.business_id == Business.id, MatchResult.eligible == True)
+        )
+        if filters.eligible_lender_id:
+            match = match.where(MatchResult.lender_id == filters.eligible_lender_id)
+        if filters.eligible_program_id:
+            match = match.where(MatchResult.program_id == filters.eligible_program_id)
+        if filters.min_fit_score is not None:
+            match = match.where(MatchResult.fit_score >= filters.min_fit_score)
+        query = query.filter(match.exists())
+
+    return query
+
+def _stream_applications(query_for):
+    # Own session: the response outlives the request's dependency scope.
+    # Rows are fetched from a server-side cursor in batches and dropped from
+    # the session after each batch, so memory stays flat for any export size.
+    db = SessionLocal()
+    try:
+        result = db.execute(
+            query_for(select(Business)).options(*APPLICATION_GRAPH)
+            .order_by(Business.created_at.desc(), Business.id.desc())
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        ).scalars()
+        for batch in result.partitions():
+            criteria = rejections.load_criteria(db, _rejection_codes(batch))
+            for b in batch:
+                yield ApplicationResponse.model_validate(_application_response(b, criteria), from_attributes=True).model_dump_json() + "\n"
+            db.expunge_all()
+    finally:
+        db.close()
+
+STREAM_BATCH_SIZE = 500
+NDJSON = "application/x-ndjson"
 
 @router.get("/", response_model=List[ApplicationResponse])
-def get_applications(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    businesses = db.query(Business).order_by(Business.created_at.desc()).offset(skip).limit(limit).all()
-    results = []
-    for b in businesses:
-        guarantor = db.query(PersonalGuarantor).filter(PersonalGuarantor.business_id == b.id).first()
-        credit = db.query(BusinessCredit).filter(BusinessCredit.business_id == b.id).first()
-        loan_req = db.query(LoanRequest).filter(LoanRequest.business_id == b.id).first()
-        
-        matches = []
-        if loan_req:
-            matches = _fetch_matches_for_loan_request(db, loan_req.id)
-            
-        results.append({
-            "id": b.id,
-            "created_at": b.created_at,
-            "business": b,
-            "guarantor": guarantor,
-            "business_credit": credit,
-            "loan_request": loan_req,
-            "matches": matches
-        })
-    return results
+async def get_applications(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    accept: Optional[str] = Header(default=None),
+    filters: ApplicationFilters = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List applications, newest first.
+
+    Pass the ``X-Next-Cursor`` response header back as ``cursor`` to get the
+    next page; ``skip`` is still honoured when no cursor is given. With
+    ``Accept: application/x-ndjson`` the whole book is streamed instead, one
+    application per line. Filters (see ApplicationFilters) apply to both.
+    """
+    def scoped(query):
+        query = _apply_filters(query, filters)
+        return _after_cursor(query, cursor) if cursor else query
+
+    if accept and NDJSON in accept:
+        return StreamingResponse(_stream_applications(scoped), media_type=NDJSON)
+
+    query = scoped(select(Business)).options(*APPLICATION_GRAPH).order_by(Business.created_at.desc(), Business.id.desc())
+    if not cursor and skip:
+        query = query.offset(skip)
+    businesses = (await db.scalars(query.limit(limit))).all()
+
+    if businesses and len(businesses) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(businesses[-1])
+    criteria = await db.run_sync(rejections.load_criteria, _rejection_codes(businesses))
+    return [_application_response(b, criteria) for b in businesses]
+
+@router.get("/count")
+async def count_applications(filters: ApplicationFilters = Depends(), db: AsyncSession = Depends(get_async_db)):
+    # COUNT over the same filtered query; no application rows are loaded
+    query = _apply_filters(select(Business.id), filters)
+    return {"count": await db.scalar(select(func.count()).select_from(query.subquery()))}
 
 @router.get("/{id}", response_model=ApplicationResponse)
-def get_application(id: str, db: Session = Depends(get_db)):
-    # Fetch business
-    business = db.query(Business).filter(Business.id == id).first()
-    if not business:
+async def get_application(id: str, db: AsyncSession = Depends(get_async_db)):
+    loaded = {}
+
+    async def load():
+        business = await db.scalar(select(Business).options(*APPLICATION_GRAPH).where(Business.id == id))
+        if not business:
+            return None
+        criteria = await db.run_sync(rejections.load_criteria, _rejection_codes([business]))
+        loaded["application"] = ApplicationResponse.model_validate(
+            _application_response(business, criteria), from_attributes=True
+        ).model_dump(mode="json")
+        # Matches still being computed, possibly by another worker, are not cached
+        if business.loan_request and stored_status(business.loan_request) not in SETTLED:
+            return None
+        return loaded["application"]
+
+    application = await response_cache.get_or_load_async(APPLICATION, id, load) or loaded.get("application")
+    if application is None:
         raise HTTPException(status_code=404, detail="Application not found")
-    
-    # We need to fetch related data manually if relationships aren't set up
-    guarantor = db.query(PersonalGuarantor).filter(PersonalGuarantor.business_id == id).first()
-    credit = db.query(BusinessCredit).filter(BusinessCredit.business_id == id).first()
-    loan_req = db.query(LoanRequest).filter(LoanRequest.business_id == id).first()
-    
-    matches = []
-    if loan_req:
-        matches = _fetch_matches_for_loan_request(db, loan_req.id)
-    
-    return {
-        "id": business.id,
-        "created_at": business.created_at,
-        "business": business,
-        "guarantor": guarantor,
-        "business_credit": credit,
-        "loan_request": loan_req,
-        "matches": matches
-    }
+    return application
 
-@router.get("/{id}/matches", response_model=List[MatchResultResponse])
-def get_application_matches(id: str, db: Session = Depends(get_db)):
-    # 1. Get Loan Request ID for this business application
-    loan_req = db.query(LoanRequest).filter(LoanRequest.business_id == id).first()
-    if not loan_req:
-        return []
-        
-    # 2. Get Matches
-    results = db.query(MatchResult).filter(MatchResult.loan_request_id == loan_req.id).all()
-    
-    # 3. Format Response
-    response = []
-    for r in results:
-        program = db.query(LenderProgram).filter(LenderProgram.id == r.program_id).first()
-        lender = db.query(Lender).filter(Lender.id == r.lender_id).first()
-        
-        response.append(MatchResultResponse(
-            lender_name=lender.name if lender else "Unknown",
-            program_name=program.name if program else "Unknown",
-            eligible=r.eligible,
-            fit_score=r.fit_score,
-            rejection_reasons=r.rejection_reasons
-        ))
-    return response
+@router.get("/jobs/{job_id}")
+def get_match_job(job_id: str):
+    job = match_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@router.get("/{id}/matches", response_model=List[MatchResultResponse], responses={202: {"description": "Matching pending or running"}})
+async def get_application_matches(id: str, wait: float = 0, db: AsyncSession = Depends(get_async_db)):
+    """Match results for an application.
+
+    While matching is still pending or running this returns 202 with the
+    job status; ``wait`` long-polls up to that many seconds for it to finish
+    first when this process runs the job. Failed matching returns 500 with
+    its error. Jobs of other worker processes are reported from the status
+    stored on the loan request.
+    """
+    job = match_jobs.for_application(id)
+    if job and not job.finished and wait > 0:
+        # Blocking wait on the job's event, kept off the event loop
+        await run_in_threadpool(job.wait, min(wait, MAX_MATCH_WAIT_SECONDS))
+    if job and job.status == FAILED:
+        return JSONResponse(status_code=500, content=job.to_dict())
+    if job and job.status != DONE:
+        return JSONResponse(status_code=202, content=job.to_dict())
+
+    outcome = {}
+
+    async def load():
+        outcome.update(await db.run_sync(_match_outcome, LoanRequest.business_id == id) or {})
+        # Only settled results are cached: an empty list while another worker
+        # is still matching would read as "eligible for nothing"
+        return outcome["matches"] if outcome.get("status") == DONE else None
+
+    matches = await response_cache.get_or_load_async(MATCHES, id, load)
+    if matches is not None:
+        return matches
+    if not outcome:
+        raise HTTPException(status_code=404, detail="Application not found")
+    return _status_response(id, outcome)
 
 @router.delete("/{id}", status_code=204)
 def delete_application(id: str, db: Session = Depends(get_db)):
@@ -159,7 +507,10 @@ def delete_application(id: str, db: Session = Depends(get_db)):
     if not business:
         raise HTTPException(status_code=404, detail="Application not found")
     
-    # 2. Find related LoanRequest to delete matches first
+    # 2. Idempotency keys reference both the business and the loan request
+    db.query(IdempotencyKey).filter(IdempotencyKey.business_id == id).delete()
+
+    # 3. Find related LoanRequest to delete matches first
     loan_req = db.query(LoanRequest).filter(LoanRequest.business_id == id).first()
     if loan_req:
         # Delete matches
@@ -167,11 +518,12 @@ def delete_application(id: str, db: Session = Depends(get_db)):
         # Delete loan request
         db.query(LoanRequest).filter(LoanRequest.id == loan_req.id).delete()
     
-    # 3. Delete other related entities
+    # 4. Delete other related entities
     db.query(PersonalGuarantor).filter(PersonalGuarantor.business_id == id).delete()
     db.query(BusinessCredit).filter(BusinessCredit.business_id == id).delete()
     
-    # 4. Delete Business
+    # 5. Delete Business
     db.delete(business)
     db.commit()
+    response_cache.invalidate([id])
     return None
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import SessionLocal
+from app.core.database import AsyncSessionLocal, SessionLocal
 from app.schemas.policy import LenderCreate, LenderResponse, LenderProgramCreate, PolicyCriteriaCreate
 from app.models.lender import Lender, LenderProgram
 from app.models.policy import PolicyCriteria
+from app.services.policy_snapshot import bump_policy_version, refresh_policy_snapshot
+from app.services.rematch import rematch_program
 from typing import List
 
 router = APIRouter()
@@ -15,16 +19,31 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _rematch_program_in_background(program_id: str):
+    # Runs after the response with its own session; only this program's results change
+    db = SessionLocal()
+    try:
+        rematch_program(db, program_id)
+    finally:
+        db.close()
+
 @router.post("/", response_model=LenderResponse)
 def create_lender(lender_data: LenderCreate, db: Session = Depends(get_db)):
     lender = Lender(name=lender_data.name, is_active=lender_data.is_active)
     db.add(lender)
+    bump_policy_version(db)
     db.commit()
     db.refresh(lender)
+    refresh_policy_snapshot(db)
     return lender
 
 @router.post("/{lender_id}/programs")
-def create_program(lender_id: str, program_data: LenderProgramCreate, db: Session = Depends(get_db)):
+def create_program(lender_id: str, program_data: LenderProgramCreate, background_tasks: BackgroundTasks,
+                   db: Session = Depends(get_db)):
     program = LenderProgram(
         lender_id=lender_id,
         name=program_data.name,
@@ -44,9 +63,37 @@ def create_program(lender_id: str, program_data: LenderProgramCreate, db: Sessio
         )
         db.add(db_policy)
     
+    bump_policy_version(db)
     db.commit()
+    refresh_policy_snapshot(db)
+    background_tasks.add_task(_rematch_program_in_background, program.id)
     return {"message": "Program created", "program_id": program.id}
 
+@router.put("/{lender_id}/programs/{program_id}/policies")
+def replace_program_policies(lender_id: str, program_id: str, policies: List[PolicyCriteriaCreate],
+                             background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    program = db.query(LenderProgram).filter(
+        LenderProgram.id == program_id, LenderProgram.lender_id == lender_id
+    ).first()
+    if not program:
+        raise HTTPException(status_code=404, detail="Program not found")
+
+    db.query(PolicyCriteria).filter(PolicyCriteria.program_id == program_id).delete()
+    for policy in policies:
+        db.add(PolicyCriteria(
+            program_id=program_id,
+            criteria_type=policy.criteria_type,
+            operator=policy.operator,
+            value=policy.value
+        ))
+    program.policy_version = (program.policy_version or 1) + 1
+    bump_policy_version(db)
+    db.commit()
+    refresh_policy_snapshot(db)
+    # Only this program is re-scored against stored applications
+    background_tasks.add_task(_rematch_program_in_background, program_id)
+    return {"message": "Policies updated", "program_id": program_id, "policy_version": program.policy_version}
+
 @router.get("/", response_model=List[LenderResponse])
-def list_lenders(db: Session = Depends(get_db)):
-    return db.query(Lender).all()
+async def list_lenders(db: AsyncSession = Depends(get_async_db)):
+    return (await db.scalars(select(Lender))).all()
@@ -1,12 +1,52 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from app.core.metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool
 
-engine = create_engine(
-    settings.DATABASE_URL, 
-    echo=True,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+# Async drivers for the sync URLs we deploy with
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+def _echo(level: str):
+    if level == "debug":
+        return "debug"
+    return level == "true"
+
+def engine_options(url: str, is_async: bool = False) -> dict:
+    """create_engine / create_async_engine keyword arguments from Settings."""
+    options = {"echo": _echo(settings.DB_ECHO)}
+    # SQLite connections are local files, there is no server-side limit to pool against
+    if url.startswith("sqlite"):
+        if "aiosqlite" not in url:
+            options["connect_args"] = {"check_same_thread": False}
+        return options
+
+    options.update(
+        # Queue pools that feed the db_pool_checkout_wait_seconds histogram
+        poolclass=TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.startswith("postgresql"):
+        timeout = str(settings.DB_STATEMENT_TIMEOUT_MS)
+        if "asyncpg" in url:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -14,4 +54,15 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+
+# Attributes stay loaded after commit: an async session can't lazy-load them back
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 Base = declarative_base()
@@ -0,0 +1,192 @@
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db")
+
+# Statement text kept in logs and assertion messages
+_MAX_STATEMENT_LENGTH = 500
+
+
+@dataclass
+class QueryStats:
+    """Database work done on behalf of one request (or one assert_max_queries block)."""
+    statements: int = 0
+    db_time: float = 0.0
+    # Rows inserted, updated or deleted. Rows a SELECT returns aren't known at the
+    # cursor (SQLite reports -1 and asyncpg nothing until they are fetched).
+    rows_affected: int = 0
+    slowest_time: float = 0.0
+    slowest_statement: Optional[str] = None
+    # (statement, seconds) for every statement when capture is on
+    captured: Optional[List[Tuple[str, float]]] = None
+
+    def record(self, statement: str, elapsed: float, rows_affected: int):
+        self.statements += 1
+        self.db_time += elapsed
+        self.rows_affected += rows_affected
+        if elapsed >= self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest_statement = statement
+        if self.captured is not None:
+            self.captured.append((_truncate(statement), elapsed))
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} statements", '
+            f'db-slowest;dur={self.slowest_time * 1000:.2f}'
+        )
+
+    def to_dict(self) -> dict:
+        record = {
+            "statements": self.statements,
+            "db_ms": round(self.db_time * 1000, 2),
+            "rows_affected": self.rows_affected,
+            "slowest_ms": round(self.slowest_time * 1000, 2),
+            "slowest_statement": _truncate(self.slowest_statement) if self.slowest_statement else None,
+        }
+        if self.captured is not None:
+            record["captured"] = [
+                {"statement": statement, "ms": round(elapsed * 1000, 2)} for statement, elapsed in self.captured
+            ]
+        return record
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+
+# assert_max_queries blocks see every statement in the process, whichever
+# thread or event loop runs it (TestClient serves requests on its own loop)
+_watchers: List[QueryStats] = []
+_watchers_lock = threading.Lock()
+
+
+def _truncate(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > _MAX_STATEMENT_LENGTH:
+        return statement[:_MAX_STATEMENT_LENGTH] + "..."
+    return statement
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    # Only DML has a meaningful rowcount; drivers report -1 (or 0) for anything else
+    rows_affected = 0
+    if context.isinsert or context.isupdate or context.isdelete:
+        rows_affected = max(getattr(cursor, "rowcount", -1), 0)
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed, rows_affected)
+    if _watchers:
+        with _watchers_lock:
+            for watcher in _watchers:
+                watcher.record(statement, elapsed, rows_affected)
+
+    if elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "ms": round(elapsed * 1000, 2),
+            "rows_affected": rows_affected,
+            "statement": _truncate(statement),
+        }))
+
+
+def instrument_engine(engine: Engine):
+    """Time every statement run through ``engine`` (pass async_engine.sync_engine for async)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """Collects QueryStats per HTTP request.
+
+    Adds a ``Server-Timing`` header with the DB time, statement count and
+    slowest statement, and logs one JSON record per request on ``app.db``.
+    A ``DB_STATEMENT_SAMPLE_RATE`` fraction of requests also log every
+    statement they ran. Statements a streamed body runs after the headers
+    went out are only in the log.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        if settings.DB_STATEMENT_SAMPLE_RATE and random.random() < settings.DB_STATEMENT_SAMPLE_RATE:
+            stats.captured = []
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = None
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(json.dumps({
+                    "event": "request_db",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status,
+                    "total_ms": round((time.perf_counter() - started) * 1000, 2),
+                    **stats.to_dict(),
+                }))
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """Stats of the request being served, if any."""
+    return _request_stats.get()
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Fail if more than ``limit`` statements run inside the block.
+
+    For tests guarding against N+1 regressions::
+
+        with assert_max_queries(5):
+            client.get("/api/applications/")
+
+    Counts every statement on the instrumented engines in this process,
+    including background jobs that happen to run meanwhile.
+    """
+    stats = QueryStats(captured=[])
+    with _watchers_lock:
+        _watchers.append(stats)
+    try:
+        yield stats
+    finally:
+        with _watchers_lock:
+            _watchers.remove(stats)
+    if stats.statements > limit:
+        listing = "\n".join(f"  {statement}" for statement, _ in stats.captured)
+        raise AssertionError(f"Expected at most {limit} queries, got {stats.statements}:\n{listing}")
@@ -0,0 +1,349 @@
+"""In-process Prometheus collectors.
+
+Counters and histograms write to a per-thread shard, so recording is a dict
+update with no lock; shards are summed only when /metrics is scraped.
+Callback metrics read a value (e.g. cache stats) at scrape time.
+"""
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_registry: List["_Metric"] = []
+
+# Checked by the matching hot loop before recording; benchmarks flip it at runtime
+ENABLED = settings.METRICS_ENABLED
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+    def _labels(self, key: Tuple) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class _Sharded(_Metric):
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def _replace_shard(self, old: dict, new: dict):
+        # Called by the owning thread; scrapes see either dict whole, never a mix
+        self._local.shard = new
+        with self._shards_lock:
+            self._shards[next(i for i, shard in enumerate(self._shards) if shard is old)] = new
+
+    def _snapshot_shards(self) -> List[dict]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        # dict.copy is atomic under the GIL, so writers never need to wait
+        return [shard.copy() for shard in shards]
+
+
+class Counter(_Sharded):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def inc_many(self, counts: Dict[Tuple, float]):
+        """Add a batch of per-label counts, e.g. one evaluation's worth."""
+        self.inc_many_pairs(counts.items())
+
+    def inc_many_pairs(self, pairs: Iterable[Tuple[Tuple, float]]):
+        shard = self._shard()
+        for labels, amount in pairs:
+            shard[labels] = shard.get(labels, 0) + amount
+
+    def samples(self):
+        totals: Dict[Tuple, float] = {}
+        for shard in self._snapshot_shards():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return [(self.name + "_total", self._labels(key), value) for key, value in sorted(totals.items())]
+
+
+class LabelGroup:
+    """A fixed sequence of label tuples that a VectorCounter updates all at once.
+
+    Compared and hashed by identity, so using one as a key costs nothing
+    however many labels it holds.
+    """
+    __slots__ = ("labels",)
+
+    def __init__(self, labels: Sequence[Tuple]):
+        self.labels = tuple(labels)
+
+
+class VectorCounter(_Sharded):
+    """Counter whose hot-path update is one numpy add over a LabelGroup.
+
+    Suited to per-program counts, where every program of a snapshot is
+    touched on every evaluation. Each policy refresh brings a new group; the
+    first update with it folds the shard's older groups into plain
+    per-label totals, so memory follows the labels seen, not the refreshes.
+    """
+    type = "counter"
+
+    def add(self, group: LabelGroup, amounts=1):
+        """Add ``amounts`` (a scalar, or an array aligned with ``group.labels``)."""
+        shard = self._shard()
+        totals = shard.get(group)
+        if totals is None:
+            if shard:
+                shard = self._retire_groups(shard)
+            totals = shard[group] = np.zeros(len(group.labels), dtype=np.int64)
+        totals += amounts
+
+    def _retire_groups(self, shard: dict) -> dict:
+        merged: Dict[Tuple, int] = {}
+        for key, value in shard.items():
+            if isinstance(key, LabelGroup):
+                for labels, count in zip(key.labels, value.tolist()):
+                    merged[labels] = merged.get(labels, 0) + count
+            else:
+                merged[key] = merged.get(key, 0) + value
+        self._replace_shard(shard, merged)
+        return merged
+
+    def samples(self):
+        totals: Dict[Tuple, float] = {}
+        for shard in self._snapshot_shards():
+            for key, value in shard.items():
+                if isinstance(key, LabelGroup):
+                    for labels, count in zip(key.labels, value.tolist()):
+                        totals[labels] = totals.get(labels, 0) + count
+                else:
+                    totals[key] = totals.get(key, 0) + value
+        return [(self.name + "_total", self._labels(key), value) for key, value in sorted(totals.items())]
+
+
+class Histogram(_Sharded):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        shard = self._shard()
+        state = shard.get(labels)
+        if state is None:
+            # Per-bucket (not cumulative) counts, then sum and count
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def time(self, *labels) -> "_Timer":
+        return _Timer(self, labels)
+
+    def samples(self):
+        n = len(self.buckets) + 1
+        totals: Dict[Tuple, list] = {}
+        for shard in self._snapshot_shards():
+            for key, state in shard.items():
+                state = list(state)
+                total = totals.setdefault(key, [0] * n + [0.0, 0])
+                for i in range(n + 2):
+                    total[i] += state[i]
+
+        out = []
+        for key, total in sorted(totals.items()):
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), total[:n]):
+                cumulative += count
+                out.append((self.name + "_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            out.append((self.name + "_sum", labels, total[-2]))
+            out.append((self.name + "_count", labels, total[-1]))
+        return out
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: Tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+
+
+class Callback(_Metric):
+    """Value read at scrape time; ``fn`` returns a number or {label tuple: number}."""
+
+    def __init__(self, name: str, help: str, fn: Callable[[], Union[float, Dict[Tuple, float]]],
+                 labelnames: Sequence[str] = (), type: str = "gauge"):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+        self.type = type
+
+    def samples(self):
+        name = self.name + "_total" if self.type == "counter" else self.name
+        value = self.fn()
+        if isinstance(value, dict):
+            return [(name, self._labels(key), v) for key, v in sorted(value.items())]
+        return [(name, {}, value)]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            if labels:
+                label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+            else:
+                lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+# --- Application metrics --------------------------------------------------
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route", "status")
+)
+MATCH_EVALUATE_SECONDS = Histogram(
+    "matching_evaluate_seconds", "Time to match one application against the policy snapshot."
+)
+MATCH_PROGRAMS_EVALUATED = Histogram(
+    "matching_programs_evaluated", "Programs evaluated per matched application (0 on a match cache hit).",
+    buckets=(0,) + COUNT_BUCKETS
+)
+PROGRAM_EVALUATIONS = VectorCounter(
+    "matching_program_evaluations", "Program evaluations by program.", ("program_id",)
+)
+PROGRAM_REJECTIONS = VectorCounter(
+    "matching_program_rejections", "Programs that rejected an application, by program.", ("program_id",)
+)
+CRITERIA_EVALUATIONS = Counter(
+    "matching_criteria_evaluations", "Criteria applied to an application, by criteria type.", ("criteria_type",)
+)
+CRITERIA_REJECTIONS = Counter(
+    "matching_criteria_rejections", "Criteria an application failed, by criteria type.", ("criteria_type",)
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.", ("pool",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+    _metric_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started, self._metric_label)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    _metric_label = "async"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started, self._metric_label)
+
+
+class MetricsMiddleware:
+    """Observes HTTP_REQUEST_SECONDS for every request.
+
+    Labelled with the route template, not the raw path, so ids don't blow up
+    the series count; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, scope["method"], _route_template(scope), str(status)
+            )
+
+
+def _route_template(scope) -> str:
+    # Routing records the matched endpoint and its path params on the scope;
+    # putting the param names back gives the full template under any prefix
+    if "endpoint" not in scope:
+        return "unmatched"
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(
+        "{" + names[segment] + "}" if segment in names else segment
+        for segment in scope["path"].split("/")
+    )
@@ -0,0 +1,396 @@
+"""Opt-in profiling of single requests and offline runs.
+
+Off unless PROFILING_TOKEN is set. A request carrying the token in an
+``X-Profile`` header (or a ``profile`` query parameter) is run under a
+profiler, chosen with ``X-Profile-Format`` / ``profile_format``:
+
+  * ``pstats`` (default): cProfile, deterministic. Saved as a .prof file for
+    ``python -m pstats``, snakeviz and the like.
+  * ``speedscope``: a sampling profiler that records whole stacks every
+    PROFILING_SAMPLE_INTERVAL_MS, or as often as the GIL lets it (threads
+    switch every 5 ms by default). Sample weights are measured time, so
+    totals stay right. Saved as .speedscope.json for
+    https://www.speedscope.app.
+
+Profiles go to PROFILING_DIR and the file name is returned in the
+``X-Profile-Id`` header; with ``X-Profile-Output: inline`` (or
+``profile_output=inline``) the profile replaces the response body instead
+and the original status is in ``X-Profile-Status``.
+
+The event loop thread is profiled for the whole request, so coroutines of
+other requests it serves meanwhile show up too; profile on a quiet
+instance. Work handed to the threadpool through this module's
+run_in_threadpool (matching on submit) is profiled in its worker thread as
+well. At most PROFILING_MAX_CONCURRENT requests are profiled at once, and
+only one with cProfile in the whole process, since from Python 3.12 cProfile
+hooks sys.monitoring, which admits one active profiler per process; requests
+over the cap run normally with ``X-Profile: skipped``. Offline runs under
+``profiled`` wait for their turn instead.
+"""
+import cProfile
+import functools
+import hmac
+import json
+import logging
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import pstats
+from starlette.concurrency import run_in_threadpool as _run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.profiling")
+
+PSTATS = "pstats"
+SPEEDSCOPE = "speedscope"
+FORMATS = (PSTATS, SPEEDSCOPE)
+
+_EXTENSIONS = {PSTATS: ".prof", SPEEDSCOPE: ".speedscope.json"}
+
+# From 3.12 a cProfile.Profile sees every thread, and enabling a second one
+# anywhere in the process raises ValueError
+_CPROFILE_PROCESS_WIDE = sys.version_info >= (3, 12)
+# Held by whoever runs a DeterministicProfiler, see the module docstring
+_cprofile = threading.Lock()
+_MEDIA_TYPES = {PSTATS: "application/octet-stream", SPEEDSCOPE: "application/json"}
+
+
+class _Profiler:
+    format: str
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @contextmanager
+    def thread(self):
+        """Profile the calling thread inside the block."""
+        raise NotImplementedError
+
+    def call(self, fn: Callable, *args, **kwargs):
+        with self.thread():
+            return fn(*args, **kwargs)
+
+    def close(self):
+        pass
+
+    def render(self) -> bytes:
+        raise NotImplementedError
+
+
+class DeterministicProfiler(_Profiler):
+    """cProfile, one Profile per participating thread, merged on render.
+
+    From Python 3.12 a single Profile, enabled while any participating thread
+    is inside ``thread()``, covers them all. Callers must hold ``_cprofile``.
+    """
+    format = PSTATS
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._depth = 0
+
+    @contextmanager
+    def thread(self):
+        if _CPROFILE_PROCESS_WIDE:
+            with self._lock:
+                self._depth += 1
+                if self._depth == 1:
+                    if not self._profiles:
+                        self._profiles.append(cProfile.Profile())
+                    self._profiles[0].enable()
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._depth -= 1
+                    if not self._depth:
+                        self._profiles[0].disable()
+        else:
+            profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+
+    def render(self) -> bytes:
+        # Same bytes pstats.Stats.dump_stats writes
+        return marshal.dumps(pstats.Stats(*self._profiles).stats)
+
+
+class SamplingProfiler(_Profiler):
+    """Samples the stacks of participating threads from a background thread."""
+    format = SPEEDSCOPE
+
+    def __init__(self, name: str, interval: float):
+        super().__init__(name)
+        self.interval = interval
+        self._threads: Dict[int, int] = {}  # thread ident -> nesting depth
+        self._frames: Dict[Tuple[str, str, int], int] = {}
+        # thread ident -> (thread name, [(stack, weight)])
+        self._samples: Dict[int, Tuple[str, List[Tuple[Tuple[int, ...], float]]]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+        self._sampler.start()
+
+    @contextmanager
+    def thread(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] = self._threads.get(ident, 0) + 1
+            self._samples.setdefault(ident, (threading.current_thread().name, []))
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._threads[ident] -= 1
+                if not self._threads[ident]:
+                    del self._threads[ident]
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frames = sys._current_frames()
+            with self._lock:
+                for ident in self._threads:
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        self._samples[ident][1].append((self._stack(frame), now - last))
+            last = now
+
+    def _stack(self, frame) -> Tuple[int, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+            index = self._frames.get(key)
+            if index is None:
+                index = self._frames[key] = len(self._frames)
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        return tuple(stack)
+
+    def close(self):
+        self._stop.set()
+        self._sampler.join()
+
+    def render(self) -> bytes:
+        profiles = []
+        for thread_name, samples in self._samples.values():
+            if not samples:
+                continue
+            total = sum(weight for _, weight in samples)
+            profiles.append({
+                "type": "sampled",
+                "name": f"{self.name} ({thread_name})",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": [list(stack) for stack, _ in samples],
+                "weights": [weight for _, weight in samples],
+            })
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "lender-matching-platform",
+            "shared": {"frames": [
+                {"name": name, "file": filename, "line": line} for name, filename, line in self._frames
+            ]},
+            "profiles": profiles,
+        }).encode()
+
+
+def new_profiler(name: str, format: str = PSTATS) -> _Profiler:
+    if format == PSTATS:
+        return DeterministicProfiler(name)
+    if format == SPEEDSCOPE:
+        return SamplingProfiler(name, settings.PROFILING_SAMPLE_INTERVAL_MS / 1000)
+    raise ValueError(f"Unknown profile format: {format}")
+
+
+def save(data: bytes, filename: str, directory: Optional[str] = None) -> str:
+    directory = directory or settings.PROFILING_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, filename)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+def _filename(name: str, format: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", name).strip("-")[:80] or "root"
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{slug}-{uuid.uuid4().hex[:8]}{_EXTENSIONS[format]}"
+
+
+_active: ContextVar[Optional[_Profiler]] = ContextVar("active_profiler", default=None)
+
+
+async def run_in_threadpool(fn: Callable, *args, **kwargs):
+    """starlette's run_in_threadpool, profiling the worker thread too if the request is profiled."""
+    profiler = _active.get()
+    if profiler is None:
+        return await _run_in_threadpool(fn, *args, **kwargs)
+    return await _run_in_threadpool(profiler.call, fn, *args, **kwargs)
+
+
+def profiled(name: Optional[str] = None, format: str = PSTATS, directory: Optional[str] = None):
+    """Profile every call of the decorated function and save it under ``directory``.
+
+    For offline runs such as a re-match or a script driving MatchingEngine::
+
+        @profiled("rematch", format="speedscope")
+        def run():
+            ...
+
+    Only the calling process is profiled, so matching done in a process
+    pool is not. The path of the last profile is on ``wrapper.last_profile``.
+    """
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            exclusive = format == PSTATS
+            if exclusive:
+                _cprofile.acquire()
+            profiler = new_profiler(label, format)
+            token = _active.set(profiler)
+            try:
+                return profiler.call(fn, *args, **kwargs)
+            finally:
+                _active.reset(token)
+                profiler.close()
+                if exclusive:
+                    _cprofile.release()
+                wrapper.last_profile = save(profiler.render(), _filename(label, format), directory)
+                logger.info("Profile of %s written to %s", label, wrapper.last_profile)
+
+        wrapper.last_profile = None
+        return wrapper
+    return decorate
+
+
+# Caps profiled requests per process; cProfile additionally runs one at a time
+_slots = threading.BoundedSemaphore(max(settings.PROFILING_MAX_CONCURRENT, 1))
+
+
+def _request_options(scope) -> Optional[Dict[str, str]]:
+    """Profile options of a request carrying the profiling token, else None."""
+    headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope["headers"]
+               if k.startswith(b"x-profile")}
+    query = {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode("latin-1")).items()
+             if k.startswith("profile")}
+    supplied = headers.get("x-profile") or query.get("profile")
+    if not supplied or not hmac.compare_digest(supplied.encode(), settings.PROFILING_TOKEN.encode()):
+        return None
+    return {
+        "format": headers.get("x-profile-format") or query.get("profile_format") or PSTATS,
+        "output": headers.get("x-profile-output") or query.get("profile_output") or "file",
+    }
+
+
+class ProfilingMiddleware:
+    """Profiles requests that carry PROFILING_TOKEN; see the module docstring."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.PROFILING_TOKEN:
+            await self.app(scope, receive, send)
+            return
+        options = _request_options(scope)
+        if options is None:
+            await self.app(scope, receive, send)
+            return
+        if options["format"] not in FORMATS:
+            await _send_error(send, 400, f"Unknown profile format: {options['format']}")
+            return
+
+        if not _slots.acquire(blocking=False):
+            await self.app(scope, receive, _with_headers(send, [(b"x-profile", b"skipped")]))
+            return
+        exclusive = options["format"] == PSTATS
+        if exclusive and not _cprofile.acquire(blocking=False):
+            _slots.release()
+            await self.app(scope, receive, _with_headers(send, [(b"x-profile", b"skipped")]))
+            return
+
+        try:
+            await self._profile(scope, receive, send, options)
+        finally:
+            if exclusive:
+                _cprofile.release()
+            _slots.release()
+
+    async def _profile(self, scope, receive, send, options):
+        name = f"{scope['method']} {scope['path']}"
+        filename = _filename(name, options["format"])
+        inline = options["output"] == "inline"
+        response = {"status": None, "headers": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+            # The profile is the response; the app's own body is dropped
+
+        profiler = new_profiler(name, options["format"])
+        token = _active.set(profiler)
+        try:
+            with profiler.thread():
+                if inline:
+                    await self.app(scope, receive, capture)
+                else:
+                    await self.app(scope, receive, _with_headers(send, [(b"x-profile-id", filename.encode())]))
+        finally:
+            _active.reset(token)
+            profiler.close()
+
+        data = profiler.render()
+        if not inline:
+            save(data, filename)
+            return
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", _MEDIA_TYPES[options["format"]].encode()),
+                (b"content-length", str(len(data)).encode()),
+                (b"content-disposition", f'attachment; filename="{filename}"'.encode()),
+                (b"x-profile-status", str(response["status"]).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": data})
+
+
+def _with_headers(send, extra):
+    async def send_with_headers(message):
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": list(message.get("headers", [])) + extra}
+        await send(message)
+    return send_with_headers
+
+
+async def _send_error(send, status: int, detail: str):
+    body = json.dumps({"detail": detail}).encode()
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
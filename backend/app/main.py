@@ -1,7 +1,11 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.core.database import engine
-from app.api.endpoints import application, lender
+from app.core.database import async_engine, engine
+from app.core import metrics
+from app.core.instrumentation import QueryStatsMiddleware, instrument_engine
+from app.core.profiling import ProfilingMiddleware
+from app.api.endpoints import application, lender, admin
 
 app = FastAPI(title="Loan Underwriting System")
 
@@ -11,11 +15,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "X-Profile-Id"],
 )
 
+# Statement count and DB time per request, see app/core/instrumentation.py
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+# Outermost, so a profile covers the other middleware too; inert without PROFILING_TOKEN
+app.add_middleware(ProfilingMiddleware)
+
 app.include_router(application.router, prefix="/api/applications", tags=["Applications"])
 app.include_router(lender.router, prefix="/api/lenders", tags=["Lenders"])
+app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 
 @app.get("/")
 def root():
     return {"message": "Loan Underwriting System API is running"}
+
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    # Prometheus text format, from the in-process collectors in app/core/metrics.py
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
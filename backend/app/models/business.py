@@ -1,10 +1,18 @@
 import uuid
-from sqlalchemy import Column, String, Integer, Numeric, DateTime
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, Numeric, DateTime, Index
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class Business(Base):
     __tablename__ = "business"
+    __table_args__ = (
+        # ApplicationFilters' state/industry filters, in listing (keyset) order so a
+        # filtered page is read off the index rather than sorted
+        Index("ix_business_state_created_at", "state", "created_at", "id"),
+        Index("ix_business_industry_created_at", "industry", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, nullable=False)
@@ -12,4 +20,10 @@ class Business(Base):
     state = Column(String, nullable=False)
     years_in_business = Column(Integer, nullable=False)
     annual_revenue = Column(Numeric, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set client side too so keyset cursors compare like with like on SQLite
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), server_default=func.now(), index=True)
+
+    # One of each per application
+    guarantor = relationship("PersonalGuarantor", uselist=False, viewonly=True)
+    business_credit = relationship("BusinessCredit", uselist=False, viewonly=True)
+    loan_request = relationship("LoanRequest", uselist=False, viewonly=True)
@@ -6,6 +6,6 @@ class BusinessCredit(Base):
     __tablename__ = "business_credit"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    business_id = Column(String, ForeignKey("business.id"))
+    business_id = Column(String, ForeignKey("business.id"), index=True)
     paynet_score = Column(Integer, nullable=True)
     trade_lines = Column(Integer, nullable=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_key"
+
+    # Client supplied Idempotency-Key header of a submit
+    key = Column(String, primary_key=True)
+    business_id = Column(String, ForeignKey("business.id"), nullable=False)
+    loan_request_id = Column(String, ForeignKey("loan_request.id"), nullable=False)
+    # SHA-256 of the submitted application; a retry must send the same one
+    request_hash = Column(String, nullable=True)
+    # Keys expire after IDEMPOTENCY_KEY_TTL_HOURS
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, Numeric, ForeignKey
+from sqlalchemy import Column, String, Boolean, Integer, Numeric, ForeignKey
 from app.core.database import Base
 
 class Lender(Base):
@@ -13,7 +13,9 @@ class LenderProgram(Base):
     __tablename__ = "lender_program"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    lender_id = Column(String, ForeignKey("lender.id"))
+    lender_id = Column(String, ForeignKey("lender.id"), index=True)
     name = Column(String, nullable=False)
     min_loan_amount = Column(Numeric)
     max_loan_amount = Column(Numeric)
+    # Bumped whenever the program's criteria change
+    policy_version = Column(Integer, nullable=False, default=1, server_default="1")
@@ -1,5 +1,6 @@
 import uuid
-from sqlalchemy import Column, Integer, Numeric, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Numeric, String, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -7,9 +8,20 @@ class LoanRequest(Base):
     __tablename__ = "loan_request"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    business_id = Column(String, ForeignKey("business.id"))
+    business_id = Column(String, ForeignKey("business.id"), index=True)
     amount = Column(Numeric, nullable=False)
     term_months = Column(Integer, nullable=False)
     equipment_type = Column(String, nullable=True)
     equipment_year = Column(Integer, nullable=True)
+    # Feature vector used for matching, kept so single programs can be re-scored
+    features = Column(JSON, nullable=True)
+    # Matching status (app/services/match_jobs.py), shared by every worker
+    # process; NULL on rows that predate it, which were matched inline
+    match_status = Column(String, nullable=True)
+    match_error = Column(String, nullable=True)
+    # Bumped whenever stalled matching is taken over; only the current attempt may settle it
+    match_attempt = Column(Integer, nullable=False, default=0, server_default="0")
+    match_updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    matches = relationship("MatchResult", viewonly=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
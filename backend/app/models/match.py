@@ -1,19 +1,25 @@
 import uuid
-from sqlalchemy import Column, Boolean, Integer, ForeignKey, DateTime, String, JSON
+from sqlalchemy import Column, Boolean, Integer, ForeignKey, DateTime, String, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 
 class MatchResult(Base):
     __tablename__ = "match_result"
+    __table_args__ = (
+        # Serves plain loan_request_id lookups too, so no separate index on it
+        Index("ix_match_result_loan_request_eligible_fit", "loan_request_id", "eligible", "fit_score"),
+    )
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     loan_request_id = Column(String, ForeignKey("loan_request.id"))
     lender_id = Column(String, ForeignKey("lender.id"))
-    program_id = Column(String, ForeignKey("lender_program.id"))
+    program_id = Column(String, ForeignKey("lender_program.id"), index=True)
     eligible = Column(Boolean, nullable=False)
     fit_score = Column(Integer)
     rejection_reasons = Column(JSON)
+    # LenderProgram.policy_version this result was evaluated against
+    policy_version = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     lender = relationship("Lender")
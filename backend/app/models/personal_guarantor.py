@@ -6,7 +6,7 @@ class PersonalGuarantor(Base):
     __tablename__ = "personal_guarantor"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    business_id = Column(String, ForeignKey("business.id"))
+    business_id = Column(String, ForeignKey("business.id"), index=True)
     fico_score = Column(Integer, nullable=False)
     bankruptcy_flag = Column(Boolean, default=False)
     bankruptcy_date = Column(Date, nullable=True)
@@ -1,12 +1,20 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON
 from app.core.database import Base
 
 class PolicyCriteria(Base):
     __tablename__ = "policy_criteria"
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    program_id = Column(String, ForeignKey("lender_program.id"))
+    program_id = Column(String, ForeignKey("lender_program.id"), index=True)
     criteria_type = Column(String, nullable=False)
     operator = Column(String, nullable=False)
     value = Column(JSON, nullable=False)
+
+class PolicyCatalogVersion(Base):
+    __tablename__ = "policy_catalog_version"
+
+    # Single row (id 1), bumped in every transaction that changes lenders,
+    # programs or criteria so each process can tell its snapshot is stale
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
@@ -26,6 +26,18 @@ class BusinessBase(BaseModel):
     years_in_business: int = Field(..., ge=0)
     annual_revenue: Optional[float] = None
 
+class ApplicationFilters(BaseModel):
+    """Query parameters for narrowing the application list server side."""
+    eligible_lender_id: Optional[str] = None
+    eligible_program_id: Optional[str] = None
+    min_fit_score: Optional[int] = None
+    state: Optional[str] = None
+    industry: Optional[str] = None
+    fico_min: Optional[int] = None
+    fico_max: Optional[int] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
 class ApplicationCreate(BaseModel):
     business: BusinessBase
     guarantor: PersonalGuarantorBase
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, List, Any
 from uuid import UUID
+from app.services.rule_compiler import PolicyCompileError, compile_criterion
 
 class PolicyCriteriaBase(BaseModel):
     criteria_type: str  # e.g., "fico_score", "years_in_business"
@@ -8,7 +9,14 @@ class PolicyCriteriaBase(BaseModel):
     value: Any
 
 class PolicyCriteriaCreate(PolicyCriteriaBase):
-    pass
+    @model_validator(mode="after")
+    def check_compiles(self):
+        # Reject malformed rules on write instead of failing them on every match
+        try:
+            compile_criterion(self.criteria_type, self.operator, self.value)
+        except PolicyCompileError as e:
+            raise ValueError(str(e))
+        return self
 
 class PolicyCriteriaResponse(PolicyCriteriaBase):
     id: str
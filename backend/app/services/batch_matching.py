@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from app.services.features import FEATURES, SLOT, FeatureVector
+from app.services.policy_snapshot import PolicySnapshot
+from app.services.rejections import AMOUNT_MAX, AMOUNT_MIN
+from app.services.rule_compiler import (
+    BOOLEAN_CRITERIA,
+    COMPARISONS,
+    NUMERIC_CRITERIA,
+    PolicyCompileError,
+    parse_criterion,
+)
+
+_ANNUAL_REVENUE = SLOT["annual_revenue"]
+_LOAN_AMOUNT = SLOT["loan_amount"]
+
+# (values, present) per feature slot
+Column = Tuple[np.ndarray, np.ndarray]
+
+
+@dataclass
+class BatchMatch:
+    """Result of matching N applications against all P snapshot programs.
+
+    ``eligible`` and ``fit_scores`` are (N, P) matrices in snapshot program
+    order. Rejection codes are only built on request.
+    """
+    snapshot: PolicySnapshot
+    features: Sequence[FeatureVector]
+    eligible: np.ndarray
+    fit_scores: np.ndarray
+    too_low: np.ndarray
+    too_high: np.ndarray
+    failed: List[np.ndarray]
+
+    def result(self, app_index: int, program_index: int) -> Dict[str, Any]:
+        """Same dict _evaluate_program returns for this application and program."""
+        if self.eligible[app_index, program_index]:
+            return {"eligible": True, "fit_score": int(self.fit_scores[app_index, program_index]), "rejection_reasons": []}
+
+        program = self.snapshot.programs[program_index]
+        features = self.features[app_index]
+        reasons = []
+        if self.too_low[app_index, program_index]:
+            reasons.append((AMOUNT_MIN, features[_LOAN_AMOUNT]))
+        if self.too_high[app_index, program_index]:
+            reasons.append((AMOUNT_MAX, features[_LOAN_AMOUNT]))
+        failed = self.failed[program_index]
+        for k, criteria in enumerate(program.criteria):
+            if failed[k, app_index]:
+                reasons.append((criteria.id, features[criteria.slot] if criteria.slot is not None else None))
+        return {"eligible": False, "fit_score": 0, "rejection_reasons": reasons}
+
+
+def build_columns(features: Sequence[FeatureVector]) -> Dict[int, Column]:
+    """Transpose feature vectors into one typed column per feature slot."""
+    columns = {}
+    for slot, name in enumerate(FEATURES):
+        raw = [fv[slot] for fv in features]
+        present = np.fromiter((v is not None for v in raw), dtype=bool, count=len(raw))
+        if name in NUMERIC_CRITERIA or name == "loan_amount":
+            values = np.array([float(v) if v is not None else np.nan for v in raw], dtype=np.float64)
+        elif name in BOOLEAN_CRITERIA:
+            values = np.array([bool(v) for v in raw], dtype=bool)
+        else:
+            values = np.array([v if v is not None else "" for v in raw], dtype=str)
+        columns[slot] = (values, present)
+    return columns
+
+
+def match_batch(snapshot: PolicySnapshot, features: Sequence[FeatureVector]) -> BatchMatch:
+    """Evaluate every distinct condition as one vectorized comparison per column."""
+    n = len(features)
+    p = len(snapshot.programs)
+    columns = build_columns(features)
+    amount = columns[_LOAN_AMOUNT][0]
+    revenue, revenue_present = columns[_ANNUAL_REVENUE]
+
+    eligible = np.zeros((n, p), dtype=bool)
+    too_low = np.zeros((n, p), dtype=bool)
+    too_high = np.zeros((n, p), dtype=bool)
+    failed = []
+
+    # Fit score bonus is program independent, see MatchingEngine._evaluate_program
+    bonus = revenue_present & (revenue != 0) & (revenue > amount * 2)
+    score = np.minimum(100 + 10 * bonus.astype(np.int64), 100)
+
+    # Shared condition nodes: one vectorized comparison per distinct condition
+    node_failed = [
+        ~_vector_check(node.criteria_type, node.operator, node.value, columns, n)
+        for node in snapshot.nodes
+    ]
+
+    for j, program in enumerate(snapshot.programs):
+        ok = np.ones(n, dtype=bool)
+        if program.min_loan_amount:
+            too_low[:, j] = amount < float(program.min_loan_amount)
+            ok &= ~too_low[:, j]
+        if program.max_loan_amount:
+            too_high[:, j] = amount > float(program.max_loan_amount)
+            ok &= ~too_high[:, j]
+
+        program_failed = np.zeros((len(program.criteria), n), dtype=bool)
+        for k, criteria in enumerate(program.criteria):
+            program_failed[k] = node_failed[criteria.node]
+        if len(program.criteria):
+            ok &= ~program_failed.any(axis=0)
+
+        eligible[:, j] = ok
+        failed.append(program_failed)
+
+    fit_scores = np.where(eligible, score[:, None], 0)
+    return BatchMatch(snapshot=snapshot, features=features, eligible=eligible, fit_scores=fit_scores,
+                      too_low=too_low, too_high=too_high, failed=failed)
+
+
+def _vector_check(criteria_type: str, op: str, value: Any, columns: Dict[int, Column], n: int) -> np.ndarray:
+    try:
+        slot, op, target = parse_criterion(criteria_type, op, value)
+    except PolicyCompileError:
+        return np.zeros(n, dtype=bool)
+
+    values, present = columns[slot]
+    if op == "in":
+        return present & np.isin(values, list(target))
+    if op == "not in":
+        return present & ~np.isin(values, list(target))
+    return present & COMPARISONS[op](values, target)
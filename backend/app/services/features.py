@@ -0,0 +1,83 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+from app.schemas.application import ApplicationCreate
+
+# Fixed slot order of the per-application feature vector. Compiled rules
+# capture the slot index of their criteria_type, so reads are a tuple index.
+FEATURES = (
+    "fico_score",
+    "years_in_business",
+    "annual_revenue",
+    "industry",
+    "state",
+    "equipment_year",
+    "equipment_age",
+    "bankruptcy",
+    "years_since_bankruptcy",
+    "paynet_score",
+    "trade_lines",
+    "equipment_type",
+    "loan_amount",
+)
+SLOT: Dict[str, int] = {name: i for i, name in enumerate(FEATURES)}
+
+FeatureVector = Tuple[Any, ...]
+
+
+def extract_features(app: ApplicationCreate, as_of: Optional[datetime] = None) -> FeatureVector:
+    """Flatten an application into its feature vector, once per evaluation.
+
+    Time-dependent features are computed against ``as_of`` so every rule in
+    one evaluation sees the same clock.
+    """
+    return _build_features(app.business, app.guarantor, app.business_credit, app.loan_request, as_of)
+
+
+def extract_record_features(business, guarantor, credit, loan_request, as_of: Optional[datetime] = None) -> FeatureVector:
+    """Feature vector for a stored application, from its ORM rows.
+
+    Numeric columns come back as Decimal and are normalized to float so the
+    vector matches one built from the submitted payload.
+    """
+    return _build_features(business, guarantor, credit, loan_request, as_of)
+
+
+def _build_features(business, guarantor, credit, loan_request, as_of: Optional[datetime]) -> FeatureVector:
+    as_of = as_of or datetime.now()
+    today = as_of.date()
+
+    # Safe access helpers
+    paynet = credit.paynet_score if credit else 0
+    trade_lines = credit.trade_lines if credit else 0
+
+    # Calculate years since bankruptcy
+    years_since_bk = 999 # Default to high number if no bankruptcy
+    if guarantor.bankruptcy_flag:
+        if guarantor.bankruptcy_date:
+            delta = today - guarantor.bankruptcy_date
+            years_since_bk = delta.days / 365.25
+        else:
+            years_since_bk = 0 # Assume recent if flagged but no date provided
+
+    equipment_year = loan_request.equipment_year
+
+    return (
+        guarantor.fico_score,
+        business.years_in_business,
+        _number(business.annual_revenue),
+        business.industry,
+        business.state,
+        equipment_year,
+        (as_of.year - equipment_year) if equipment_year else 0,
+        bool(guarantor.bankruptcy_flag),
+        years_since_bk,
+        paynet,
+        trade_lines,
+        loan_request.equipment_type,
+        _number(loan_request.amount),
+    )
+
+
+def _number(value: Any) -> Any:
+    return float(value) if isinstance(value, Decimal) else value
@@ -0,0 +1,100 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.features import FeatureVector
+
+# Per-program verdicts in snapshot program order: (eligible, fit_score, rejection codes)
+Verdicts = Tuple[Tuple[bool, int, Tuple[tuple, ...]], ...]
+
+
+def fingerprint(features: FeatureVector) -> str:
+    """Canonical hash of a feature vector.
+
+    Integral floats are folded into ints so a vector rebuilt from stored
+    Decimal columns hashes the same as one built from the submitted payload.
+    """
+    canonical = tuple(
+        int(v) if isinstance(v, float) and v.is_integer() else v
+        for v in features
+    )
+    return hashlib.blake2b(repr(canonical).encode(), digest_size=16).hexdigest()
+
+
+class MatchResultCache:
+    """Bounded LRU of match verdicts keyed by feature fingerprint.
+
+    Entries belong to one policy snapshot version; the first lookup against
+    a newer version drops everything cached for the old one.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Verdicts]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, version: int, key: str) -> Optional[Verdicts]:
+        with self._lock:
+            self._check_version(version)
+            verdicts = self._entries.get(key) if version == self._version else None
+            if verdicts is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return verdicts
+
+    def put(self, version: int, key: str, verdicts: Verdicts):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._check_version(version)
+            # A result computed against an older snapshot must not outlive it
+            if version != self._version:
+                return
+            self._entries[key] = verdicts
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "policy_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _check_version(self, version: int):
+        if self._version is None or version > self._version:
+            self._entries.clear()
+            self._version = version
+
+
+def to_verdicts(results: List[Dict[str, Any]]) -> Verdicts:
+    return tuple((r["eligible"], r["fit_score"], tuple(r["rejection_reasons"])) for r in results)
+
+
+match_cache = MatchResultCache(max_size=settings.MATCH_CACHE_SIZE)
+
+metrics.Callback("match_cache_hits", "Match result cache hits.", lambda: match_cache.hits, type="counter")
+metrics.Callback("match_cache_misses", "Match result cache misses.", lambda: match_cache.misses, type="counter")
+metrics.Callback("match_cache_hit_ratio", "Match result cache hits / lookups since start.",
+                 lambda: match_cache.stats()["hit_rate"])
@@ -0,0 +1,195 @@
+import logging
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.loan import LoanRequest
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# PENDING and RUNNING are unsettled: no match results are final yet
+SETTLED = (DONE, FAILED)
+
+# Finished jobs kept around for status polling
+_MAX_FINISHED_JOBS = 10000
+
+
+def set_match_status(db: Session, loan_request_id: str, status: str, error: Optional[str] = None,
+                     attempt: Optional[int] = None) -> bool:
+    """Persist a loan request's matching status in the caller's transaction.
+
+    The in-process queue below only knows its own jobs; the stored status is
+    what other workers, and this one after a restart, go by. With ``attempt``
+    the write only happens while that attempt still owns the matching (see
+    claim_match); returns whether it did.
+    """
+    query = db.query(LoanRequest).filter(LoanRequest.id == loan_request_id)
+    if attempt is not None:
+        query = query.filter(LoanRequest.match_attempt == attempt)
+    updated = query.update({
+        LoanRequest.match_status: status,
+        LoanRequest.match_error: error,
+        LoanRequest.match_updated_at: datetime.now(timezone.utc)
+    }, synchronize_session=False)
+    return updated == 1
+
+
+def claim_match(db: Session, loan_request_id: str, attempt: int) -> bool:
+    """Take over unsettled matching whose worker has gone quiet.
+
+    The claim is conditional on the attempt the caller saw, so of several
+    concurrent callers exactly one gets it; the job it starts carries
+    ``attempt + 1``, and writes of the attempt it replaced no longer land.
+    """
+    updated = db.query(LoanRequest).filter(
+        LoanRequest.id == loan_request_id,
+        LoanRequest.match_attempt == attempt,
+        LoanRequest.match_status.in_((PENDING, RUNNING))
+    ).update({
+        LoanRequest.match_status: PENDING,
+        LoanRequest.match_error: None,
+        LoanRequest.match_attempt: attempt + 1,
+        LoanRequest.match_updated_at: datetime.now(timezone.utc)
+    }, synchronize_session=False)
+    return updated == 1
+
+
+def stored_status(loan_request: LoanRequest) -> str:
+    # Rows from before statuses were stored were always matched inline
+    return loan_request.match_status or DONE
+
+
+def is_stale(loan_request: LoanRequest) -> bool:
+    """Whether unsettled matching has gone MATCH_STALE_SECONDS without progress,
+    i.e. its worker most likely died with the job."""
+    updated_at = loan_request.match_updated_at
+    if updated_at is None:
+        return True
+    if updated_at.tzinfo is None:
+        # SQLite hands timestamps back naive; they were written in UTC
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - updated_at > timedelta(seconds=settings.MATCH_STALE_SECONDS)
+
+
+class MatchJob:
+    def __init__(self, application_id: str, loan_request_id: str):
+        self.id = str(uuid.uuid4())
+        self.application_id = application_id
+        self.loan_request_id = loan_request_id
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self._finished = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: float) -> bool:
+        """Block until the job finishes or ``timeout`` seconds pass."""
+        return self._finished.wait(timeout)
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "application_id": self.application_id,
+            "status": self.status,
+            "error": self.error
+        }
+
+
+class MatchJobQueue:
+    """Bounded in-process queue of matching jobs served by a thread pool.
+
+    Each job runs in its own database session. Workers start on first use.
+    """
+
+    def __init__(self, workers: int, max_size: int):
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_size)
+        self._workers = workers
+        self._threads = []
+        self._jobs: "OrderedDict[str, MatchJob]" = OrderedDict()
+        self._by_application = {}
+        self._lock = threading.Lock()
+
+    def submit(self, application_id: str, loan_request_id: str, run: Callable) -> Optional[MatchJob]:
+        """Queue ``run(db)`` for an application; returns None when the queue is full."""
+        self._ensure_started()
+        job = MatchJob(application_id, loan_request_id)
+        with self._lock:
+            previous = self._by_application.get(application_id)
+            self._jobs[job.id] = job
+            self._by_application[application_id] = job
+        try:
+            self._queue.put_nowait((job, run))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+                if previous is not None:
+                    self._by_application[application_id] = previous
+                else:
+                    del self._by_application[application_id]
+            return None
+        with self._lock:
+            self._evict_finished()
+        return job
+
+    def get(self, job_id: str) -> Optional[MatchJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def for_application(self, application_id: str) -> Optional[MatchJob]:
+        with self._lock:
+            return self._by_application.get(application_id)
+
+    def _ensure_started(self):
+        if self._threads:
+            return
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self._workers):
+                thread = threading.Thread(target=self._work, name=f"match-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job, run = self._queue.get()
+            job.status = RUNNING
+            db = SessionLocal()
+            try:
+                run(db)
+                job.status = DONE
+            except Exception as e:
+                db.rollback()
+                logger.exception("Matching job %s failed", job.id)
+                job.status = FAILED
+                job.error = str(e)
+            finally:
+                db.close()
+                job._finished.set()
+                self._queue.task_done()
+
+    def _evict_finished(self):
+        while len(self._jobs) > _MAX_FINISHED_JOBS:
+            oldest = next(iter(self._jobs.values()))
+            if not oldest.finished:
+                break
+            del self._jobs[oldest.id]
+            if self._by_application.get(oldest.application_id) is oldest:
+                del self._by_application[oldest.application_id]
+
+
+match_jobs = MatchJobQueue(workers=settings.MATCH_WORKERS, max_size=settings.MATCH_QUEUE_SIZE)
@@ -0,0 +1,24 @@
+import uuid
+from typing import Any, Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.match import MatchResult
+
+
+def bulk_insert_match_results(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """Insert match result rows with one executemany call.
+
+    Goes through the Core table rather than ORM objects, so nothing enters
+    the session identity map. How the driver runs it differs: psycopg2
+    gets batched multi-row INSERT ... VALUES statements (SQLAlchemy's
+    insertmanyvalues), while pysqlite, aiosqlite and asyncpg run the
+    single-row INSERT once per row through the DBAPI's own executemany.
+    Ids are assigned here so callers can reference the rows. Does not commit.
+    """
+    if not rows:
+        return 0
+    for row in rows:
+        row.setdefault("id", str(uuid.uuid4()))
+    db.execute(insert(MatchResult.__table__), rows)
+    return len(rows)
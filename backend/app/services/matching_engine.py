@@ -1,144 +1,183 @@
+import time
+import numpy as np
 from sqlalchemy.orm import Session
-from app.models.lender import Lender, LenderProgram
-from app.models.policy import PolicyCriteria
-from app.models.match import MatchResult
+from app.core import metrics
 from app.schemas.application import ApplicationCreate
-from typing import List, Dict, Any
+from app.services.batch_matching import match_batch
+from app.services.match_cache import fingerprint, match_cache, to_verdicts
+from app.services.match_writer import bulk_insert_match_results
+from app.services.features import SLOT, FeatureVector, extract_features
+from app.services.policy_snapshot import CriterionSnapshot, PolicySnapshot, ProgramSnapshot, get_policy_snapshot
+from app.services.rejections import AMOUNT_MAX, AMOUNT_MIN
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+_ANNUAL_REVENUE = SLOT["annual_revenue"]
+_LOAN_AMOUNT = SLOT["loan_amount"]
 
 class MatchingEngine:
-    def __init__(self, db: Session):
+    def __init__(self, db: Optional[Session], snapshot: Optional[PolicySnapshot] = None):
+        # db is only used to load the snapshot and persist results; match_rows needs neither
         self.db = db
+        self.snapshot = snapshot or get_policy_snapshot(db)
 
-    def evaluate_application(self, app_data: ApplicationCreate, loan_request_id: str) -> List[MatchResult]:
-        lenders = self.db.query(Lender).filter(Lender.is_active == True).all()
-        results = []
-
-        for lender in lenders:
-            programs = self.db.query(LenderProgram).filter(LenderProgram.lender_id == lender.id).all()
-            for program in programs:
-                result = self._evaluate_program(program, app_data, lender)
-                
-                # Save result to DB
-                db_match = MatchResult(
-                    loan_request_id=loan_request_id,
-                    lender=lender,
-                    program=program,
-                    eligible=result["eligible"],
-                    fit_score=result["fit_score"],
-                    rejection_reasons=result["rejection_reasons"]
-                )
-                self.db.add(db_match)
-                results.append(db_match)
-        
+    def evaluate_application(self, app_data: ApplicationCreate, loan_request_id: str,
+                             as_of: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return self.evaluate_features(extract_features(app_data, as_of), loan_request_id)
+
+    def evaluate_features(self, features: FeatureVector, loan_request_id: str,
+                          commit: bool = True) -> List[Dict[str, Any]]:
+        """Match an already extracted feature vector and persist the results.
+
+        With ``commit=False`` the rows are only flushed into the caller's
+        transaction.
+        """
+        rows = self.match_rows(features, loan_request_id)
+
+        # Save results to DB in one executemany, see bulk_insert_match_results
+        bulk_insert_match_results(self.db, rows)
+        if commit:
+            self.db.commit()
+        return rows
+
+    def match_rows(self, features: FeatureVector, loan_request_id: str) -> List[Dict[str, Any]]:
+        """Match result rows for one application, without touching the database.
+
+        Pure CPU work against the snapshot, so it is safe to run in a worker
+        thread while the caller's session stays on the event loop.
+        """
+        started = time.perf_counter()
+        # Identical feature vectors get identical verdicts under one snapshot
+        key = fingerprint(features)
+        verdicts = match_cache.get(self.snapshot.version, key)
+        if verdicts is None:
+            # Every distinct condition is evaluated once, then shared by all programs
+            passed = self.snapshot.evaluate_nodes(features)
+            results = [self._evaluate_program(program, features, passed) for program in self.snapshot.programs]
+            match_cache.put(self.snapshot.version, key, to_verdicts(results))
+            if metrics.ENABLED:
+                _record_evaluation(self.snapshot, passed, results)
+        else:
+            results = [
+                {"eligible": eligible, "fit_score": fit_score, "rejection_reasons": list(reasons)}
+                for eligible, fit_score, reasons in verdicts
+            ]
+            if metrics.ENABLED:
+                metrics.MATCH_PROGRAMS_EVALUATED.observe(0)
+
+        if metrics.ENABLED:
+            metrics.MATCH_EVALUATE_SECONDS.observe(time.perf_counter() - started)
+
+        return [
+            self._match_row(loan_request_id, program, result)
+            for program, result in zip(self.snapshot.programs, results)
+        ]
+
+    def find_eligible(self, app_data: ApplicationCreate,
+                      as_of: Optional[datetime] = None) -> List[Tuple[ProgramSnapshot, Dict[str, Any]]]:
+        """Eligible programs only, without persisting anything.
+
+        The snapshot index rules out most programs up front; only the
+        survivors are evaluated. Use evaluate_application when rejection
+        reasons for every program are needed.
+        """
+        features = extract_features(app_data, as_of)
+        eligible = []
+        for i in self.snapshot.index.candidates(features):
+            program = self.snapshot.programs[i]
+            result = self._evaluate_program(program, features)
+            if result["eligible"]:
+                eligible.append((program, result))
+        return eligible
+
+    def evaluate_batch(self, apps: List[ApplicationCreate], loan_request_ids: List[str],
+                       as_of: Optional[datetime] = None) -> List[List[Dict[str, Any]]]:
+        """Match many applications against every program in one vectorized pass.
+
+        Produces the same rows, in the same order, as calling
+        evaluate_application for each application, in one insert and commit.
+        """
+        as_of = as_of or datetime.now()
+        features = [extract_features(app_data, as_of) for app_data in apps]
+        batch = match_batch(self.snapshot, features)
+
+        all_rows = []
+        for i, loan_request_id in enumerate(loan_request_ids):
+            all_rows.append([
+                self._match_row(loan_request_id, program, batch.result(i, j))
+                for j, program in enumerate(self.snapshot.programs)
+            ])
+
+        bulk_insert_match_results(self.db, [row for rows in all_rows for row in rows])
         self.db.commit()
-        return results
+        return all_rows
+
+    def _match_row(self, loan_request_id: str, program: ProgramSnapshot, result: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "loan_request_id": loan_request_id,
+            "lender_id": program.lender_id,
+            "program_id": program.id,
+            "policy_version": program.policy_version,
+            "eligible": result["eligible"],
+            "fit_score": result["fit_score"],
+            "rejection_reasons": result["rejection_reasons"]
+        }
 
-    def _evaluate_program(self, program: LenderProgram, app: ApplicationCreate, lender: Lender) -> Dict[str, Any]:
+    def _evaluate_program(self, program: ProgramSnapshot, features: FeatureVector,
+                          passed: Optional[int] = None) -> Dict[str, Any]:
+        # passed is the node bitmask from PolicySnapshot.evaluate_nodes; without
+        # it the program's own criteria are checked one by one.
         reasons = []
+        amount = features[_LOAN_AMOUNT]
         
         # 1. Basic Program Constraints
-        if program.min_loan_amount and app.loan_request.amount < program.min_loan_amount:
-            reasons.append(f"Loan amount too low (Min: {program.min_loan_amount})")
-        if program.max_loan_amount and app.loan_request.amount > program.max_loan_amount:
-            reasons.append(f"Loan amount too high (Max: {program.max_loan_amount})")
+        if program.min_loan_amount and amount < program.min_loan_amount:
+            reasons.append((AMOUNT_MIN, amount))
+        if program.max_loan_amount and amount > program.max_loan_amount:
+            reasons.append((AMOUNT_MAX, amount))
 
         # 2. Policy Criteria
-        criteria_list = self.db.query(PolicyCriteria).filter(PolicyCriteria.program_id == program.id).all()
-        
         score = 100 # Start with perfect score, deduct for "soft" failures if we had them, or use for ranking
         
-        for criteria in criteria_list:
-            if not self._check_rule(criteria, app):
-                reasons.append(f"Failed {criteria.criteria_type} check: {criteria.operator} {criteria.value}")
-                score -= 20 # Arbitrary penalty for failed rule if we wanted soft matching, but here we likely want hard fail
+        if passed is None:
+            failed = [c for c in program.criteria if not self._check_rule(c, features)]
+        elif passed & program.mask == program.mask:
+            failed = []
+        else:
+            failed = [c for c in program.criteria if not (passed >> c.node) & 1]
+
+        # Codes, not messages; see app/services/rejections.py
+        for criteria in failed:
+            reasons.append((criteria.id, features[criteria.slot] if criteria.slot is not None else None))
+            score -= 20 # Arbitrary penalty for failed rule if we wanted soft matching, but here we likely want hard fail
 
         if reasons:
             return {"eligible": False, "fit_score": 0, "rejection_reasons": reasons}
         
         # Calculate fit score (Simple logic for now)
         # Higher revenue = better score
-        if app.business.annual_revenue:
-            if app.business.annual_revenue > app.loan_request.amount * 2:
+        revenue = features[_ANNUAL_REVENUE]
+        if revenue:
+            if revenue > amount * 2:
                 score += 10
         
         return {"eligible": True, "fit_score": min(score, 100), "rejection_reasons": []}
 
-    def _check_rule(self, criteria: PolicyCriteria, app: ApplicationCreate) -> bool:
-        # Map criteria_type to value from application
-        val = self._get_value_from_app(criteria.criteria_type, app)
-        
-        if val is None:
-            return False # Fail if data missing
-
-        op = criteria.operator
-        target = criteria.value
-
-        # Type Coercion for mismatched types (DB often returns strings for JSON fields if seeded as strings)
-        try:
-            if isinstance(val, (int, float)) and isinstance(target, str):
-                try:
-                    target = float(target)
-                except ValueError:
-                    pass
-            elif isinstance(val, bool) and isinstance(target, str):
-                if target.lower() == "true": target = True
-                elif target.lower() == "false": target = False
-            
-            if op in ["in", "not in"] and isinstance(target, str):
-                import json
-                try:
-                    target = json.loads(target)
-                except:
-                    pass
-        except:
-            pass # Proceed with original values if coercion fails
-
-        try:
-            if op == ">": return val > target
-            if op == ">=": return val >= target
-            if op == "<": return val < target
-            if op == "<=": return val <= target
-            if op == "==": return val == target
-            if op == "!=": return val != target
-            if op == "in": return val in target
-            if op == "not in": return val not in target
-        except:
-            return False
-            
-        return False
-
-    def _get_value_from_app(self, key: str, app: ApplicationCreate) -> Any:
-        # Flattens the app structure for easy access
-        from datetime import datetime, date
-        current_year = datetime.now().year
-        today = date.today()
-        
-        # Safe access helpers
-        paynet = app.business_credit.paynet_score if app.business_credit else 0
-        trade_lines = app.business_credit.trade_lines if app.business_credit else 0
-        
-        # Calculate years since bankruptcy
-        years_since_bk = 999 # Default to high number if no bankruptcy
-        if app.guarantor.bankruptcy_flag:
-            if app.guarantor.bankruptcy_date:
-                # Calculate difference in years
-                delta = today - app.guarantor.bankruptcy_date
-                years_since_bk = delta.days / 365.25
-            else:
-                years_since_bk = 0 # Assume recent if flagged but no date provided
-
-        mapping = {
-            "fico_score": app.guarantor.fico_score,
-            "years_in_business": app.business.years_in_business,
-            "annual_revenue": app.business.annual_revenue,
-            "industry": app.business.industry,
-            "state": app.business.state,
-            "equipment_year": app.loan_request.equipment_year,
-            "equipment_age": (current_year - app.loan_request.equipment_year) if app.loan_request.equipment_year else 0,
-            "bankruptcy": app.guarantor.bankruptcy_flag,
-            "years_since_bankruptcy": years_since_bk,
-            "paynet_score": paynet,
-            "trade_lines": trade_lines,
-            "equipment_type": app.loan_request.equipment_type
-        }
-        return mapping.get(key)
+    def _check_rule(self, criteria: CriterionSnapshot, features: FeatureVector) -> bool:
+        # Coercion, operator dispatch and slot lookup were bound when the snapshot was compiled
+        return criteria.check(features)
+
+
+
+def _record_evaluation(snapshot: PolicySnapshot, passed: int, results: List[Dict[str, Any]]):
+    # One bulk update per counter; a failed node counts once for every
+    # program criterion that shares it, same as checking them one by one
+    metrics.MATCH_PROGRAMS_EVALUATED.observe(len(results))
+    metrics.PROGRAM_EVALUATIONS.add(snapshot.program_labels)
+    metrics.PROGRAM_REJECTIONS.add(
+        snapshot.program_labels, np.fromiter((not r["eligible"] for r in results), dtype=bool, count=len(results))
+    )
+    metrics.CRITERIA_EVALUATIONS.inc_many(snapshot.criteria_type_counts)
+    metrics.CRITERIA_REJECTIONS.inc_many_pairs(
+        node_use for k, node_use in enumerate(snapshot.node_uses) if not (passed >> k) & 1
+    )
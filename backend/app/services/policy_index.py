@@ -0,0 +1,235 @@
+import operator
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import chain
+from typing import Collection, Dict, FrozenSet, Iterable, List, Sequence, Set, Tuple
+
+from app.services.features import SLOT, FeatureVector
+from app.services.rule_compiler import PolicyCompileError, parse_criterion
+
+_LOAN_AMOUNT = SLOT["loan_amount"]
+_PASSES = {">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt}
+
+
+@dataclass(frozen=True)
+class ThresholdIndex:
+    """Programs sharing one (slot, op) threshold rule, sorted by target.
+
+    ``strictest`` maps each program to its binding target (the tightest of
+    its rules on the slot); ``uncovered`` are the programs without one.
+    """
+    slot: int
+    op: str
+    targets: Tuple[float, ...]
+    programs: Tuple[int, ...]
+    strictest: Dict[int, float]
+    uncovered: FrozenSet[int]
+
+    def failing(self, value) -> Sequence[int]:
+        if value is None:
+            return self.programs
+        if self.op == ">=":   # fails when target > value
+            return self.programs[bisect_right(self.targets, value):]
+        if self.op == ">":    # fails when target >= value
+            return self.programs[bisect_left(self.targets, value):]
+        if self.op == "<=":   # fails when target < value
+            return self.programs[:bisect_left(self.targets, value)]
+        # "<" fails when target <= value
+        return self.programs[:bisect_right(self.targets, value)]
+
+    def _passing(self, value) -> Tuple[int, ...]:
+        if self.op == ">=":   # passes when target <= value
+            return self.programs[:bisect_right(self.targets, value)]
+        if self.op == ">":    # passes when target < value
+            return self.programs[:bisect_left(self.targets, value)]
+        if self.op == "<=":   # passes when target >= value
+            return self.programs[bisect_left(self.targets, value):]
+        # "<" passes when target > value
+        return self.programs[bisect_right(self.targets, value):]
+
+    def survivor_count(self, value) -> int:
+        if value is None:
+            return len(self.uncovered)
+        return len(self._passing(value)) + len(self.uncovered)
+
+    def survivors(self, value) -> Iterable[int]:
+        if value is None:
+            return self.uncovered
+        passing = self._passing(value)
+        if len(self.strictest) < len(self.programs):
+            # A program with several rules here can pass a looser one; its strictest decides
+            passing = [i for i in passing if self.passes(i, value)]
+        return chain(passing, self.uncovered)
+
+    def passes(self, program: int, value) -> bool:
+        target = self.strictest.get(program)
+        if target is None:
+            return True
+        return value is not None and _PASSES[self.op](value, target)
+
+
+@dataclass(frozen=True)
+class MembershipIndex:
+    """Programs with an ``in`` (or ``==``) rule on one slot, keyed by allowed value."""
+    slot: int
+    programs: FrozenSet[int]
+    allowed: Dict[object, FrozenSet[int]]
+    uncovered: FrozenSet[int]
+    # programs - allowed[value], per allowed value
+    rejected: Dict[object, FrozenSet[int]]
+
+    def failing(self, value) -> Collection[int]:
+        if value is None:
+            return self.programs
+        return self.rejected.get(value, self.programs)
+
+    def survivor_count(self, value) -> int:
+        if value is None:
+            return len(self.uncovered)
+        return len(self.allowed.get(value, ())) + len(self.uncovered)
+
+    def survivors(self, value) -> Iterable[int]:
+        if value is None:
+            return self.uncovered
+        return chain(self.allowed.get(value, ()), self.uncovered)
+
+    def passes(self, program: int, value) -> bool:
+        if program not in self.programs:
+            return True
+        return value is not None and program in self.allowed.get(value, ())
+
+
+@dataclass(frozen=True)
+class ExclusionIndex:
+    """Programs with a ``not in`` (or ``!=``) rule on one slot, keyed by excluded value."""
+    slot: int
+    programs: FrozenSet[int]
+    excluded: Dict[object, FrozenSet[int]]
+    program_count: int
+
+    def failing(self, value) -> Collection[int]:
+        if value is None:
+            return self.programs
+        return self.excluded.get(value, frozenset())
+
+    def survivor_count(self, value) -> int:
+        if value is None:
+            return self.program_count - len(self.programs)
+        return self.program_count - len(self.excluded.get(value, ()))
+
+    def survivors(self, value) -> Iterable[int]:
+        # Keeps nearly every program, so it only drives a lookup no other index narrows
+        failing = self.failing(value)
+        return (i for i in range(self.program_count) if i not in failing)
+
+    def passes(self, program: int, value) -> bool:
+        if program not in self.programs:
+            return True
+        return value is not None and program not in self.excluded.get(value, ())
+
+
+# A per-program probe costs about this many set removals, see PolicyIndex.candidates
+_PROBE_COST = 8
+
+
+@dataclass(frozen=True)
+class PolicyIndex:
+    """Lookup structures over a snapshot's programs used to prune candidates.
+
+    An index only rules out programs certain to fail, so the programs that
+    survive still need a full evaluation. A lookup starts from the survivors
+    of the most selective index and narrows them with each other index,
+    either by removing its failing programs or, when that list is longer
+    than the candidates left, by probing just those candidates. Its cost
+    follows the most selective index, not the size of the catalog.
+    """
+    program_count: int
+    indexes: Tuple[object, ...]
+
+    def candidates(self, features: FeatureVector) -> List[int]:
+        if not self.indexes:
+            return list(range(self.program_count))
+        lookups = sorted(
+            ((index.survivor_count(features[index.slot]), index, features[index.slot]) for index in self.indexes),
+            key=lambda lookup: lookup[0]
+        )
+        _, driver, value = lookups[0]
+        remaining = set(driver.survivors(value))
+        for _, index, value in lookups[1:]:
+            if not remaining:
+                break
+            failing = index.failing(value)
+            if len(failing) <= len(remaining) * _PROBE_COST:
+                remaining.difference_update(failing)
+            else:
+                remaining = {i for i in remaining if index.passes(i, value)}
+        return sorted(remaining)
+
+
+def build_policy_index(programs) -> PolicyIndex:
+    # Loan amount limits behave like ">=" min / "<=" max rules on the amount slot
+    thresholds: Dict[Tuple[int, str], List[Tuple[float, int]]] = {}
+    allowed: Dict[int, Dict[object, Set[int]]] = {}
+    excluded: Dict[int, Dict[object, Set[int]]] = {}
+    constrained_in: Dict[int, Set[int]] = {}
+    constrained_not_in: Dict[int, Set[int]] = {}
+
+    for i, program in enumerate(programs):
+        if program.min_loan_amount:
+            thresholds.setdefault((_LOAN_AMOUNT, ">="), []).append((float(program.min_loan_amount), i))
+        if program.max_loan_amount:
+            thresholds.setdefault((_LOAN_AMOUNT, "<="), []).append((float(program.max_loan_amount), i))
+
+        for criteria in program.criteria:
+            try:
+                slot, op, target = parse_criterion(criteria.criteria_type, criteria.operator, criteria.value)
+            except PolicyCompileError:
+                continue  # Never passes; left to the full evaluation
+            if op in (">", ">=", "<", "<="):
+                thresholds.setdefault((slot, op), []).append((target, i))
+            elif op in ("in", "=="):
+                members = target if op == "in" else (target,)
+                constrained_in.setdefault(slot, set()).add(i)
+                by_value = allowed.setdefault(slot, {})
+                for value in members:
+                    by_value.setdefault(value, set()).add(i)
+            elif op in ("not in", "!="):
+                members = target if op == "not in" else (target,)
+                constrained_not_in.setdefault(slot, set()).add(i)
+                by_value = excluded.setdefault(slot, {})
+                for value in members:
+                    by_value.setdefault(value, set()).add(i)
+
+    everything = frozenset(range(len(programs)))
+    indexes: List[object] = []
+    for (slot, op), entries in thresholds.items():
+        entries.sort()
+        # Several rules on one slot: the highest minimum / lowest maximum binds
+        strictest: Dict[int, float] = {}
+        for target, i in entries:
+            if op in (">=", ">"):
+                strictest[i] = target
+            else:
+                strictest.setdefault(i, target)
+        indexes.append(ThresholdIndex(
+            slot=slot, op=op,
+            targets=tuple(t for t, _ in entries),
+            programs=tuple(i for _, i in entries),
+            strictest=strictest,
+            uncovered=everything - strictest.keys()
+        ))
+    for slot, programs_with_rule in constrained_in.items():
+        indexes.append(MembershipIndex(
+            slot=slot, programs=frozenset(programs_with_rule),
+            allowed={v: frozenset(ids) for v, ids in allowed[slot].items()},
+            uncovered=everything - programs_with_rule,
+            rejected={v: frozenset(programs_with_rule - ids) for v, ids in allowed[slot].items()}
+        ))
+    for slot, programs_with_rule in constrained_not_in.items():
+        indexes.append(ExclusionIndex(
+            slot=slot, programs=frozenset(programs_with_rule),
+            excluded={v: frozenset(ids) for v, ids in excluded[slot].items()},
+            program_count=len(programs)
+        ))
+
+    return PolicyIndex(program_count=len(programs), indexes=tuple(indexes))
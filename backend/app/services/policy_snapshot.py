@@ -0,0 +1,239 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import LabelGroup
+from app.models.lender import Lender, LenderProgram
+from app.models.policy import PolicyCatalogVersion, PolicyCriteria
+from app.services.policy_index import PolicyIndex, build_policy_index
+from app.services.features import SLOT, FeatureVector
+from app.services.rule_compiler import PolicyCompileError, Predicate, bind_predicate, never, parse_criterion
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ConditionNode:
+    """One distinct (criteria_type, operator, value) shared by every criterion using it."""
+    criteria_type: str
+    operator: str
+    value: Any
+    check: Predicate = field(default=never, compare=False, repr=False)
+
+
+@dataclass(frozen=True)
+class CriterionSnapshot:
+    id: str
+    criteria_type: str
+    operator: str
+    value: Any
+    node: int
+    # Feature slot whose value is recorded when the criterion fails
+    slot: Optional[int] = None
+    check: Predicate = field(default=never, compare=False, repr=False)
+
+
+@dataclass(frozen=True)
+class ProgramSnapshot:
+    id: str
+    lender_id: str
+    lender_name: str
+    name: str
+    min_loan_amount: Any
+    max_loan_amount: Any
+    criteria: Tuple[CriterionSnapshot, ...]
+    # Bits of the condition nodes this program requires
+    mask: int = 0
+    policy_version: int = 1
+
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    """Immutable, in-process copy of every active lender's programs and criteria.
+
+    A snapshot is never mutated; policy writes build a new one and swap it in.
+    ``index`` prunes programs an application cannot be eligible for, and
+    ``nodes`` holds each distinct condition once so it is evaluated once
+    per application no matter how many programs share it.
+    """
+    version: int
+    programs: Tuple[ProgramSnapshot, ...]
+    index: PolicyIndex
+    nodes: Tuple[ConditionNode, ...] = ()
+
+    def evaluate_nodes(self, features: FeatureVector) -> int:
+        """Bitmask with bit ``k`` set when ``nodes[k]`` passes for these features."""
+        bits = "".join("1" if node.check(features) else "0" for node in reversed(self.nodes))
+        return int(bits, 2) if bits else 0
+
+    @cached_property
+    def criteria_by_id(self) -> Dict[str, CriterionSnapshot]:
+        """For rendering stored rejection codes (see app/services/rejections.py)."""
+        return {c.id: c for p in self.programs for c in p.criteria}
+
+    # Label keys for the matching metrics, built once per snapshot so
+    # recording an evaluation is a few bulk counter updates
+
+    @cached_property
+    def program_labels(self) -> LabelGroup:
+        return LabelGroup((p.id,) for p in self.programs)
+
+    @cached_property
+    def criteria_type_counts(self) -> Dict[Tuple[str], int]:
+        counts: Dict[Tuple[str], int] = {}
+        for p in self.programs:
+            for c in p.criteria:
+                counts[(c.criteria_type,)] = counts.get((c.criteria_type,), 0) + 1
+        return counts
+
+    @cached_property
+    def node_uses(self) -> Tuple[Tuple[Tuple[str], int], ...]:
+        """(criteria_type label, number of program criteria sharing it) per node."""
+        uses = [0] * len(self.nodes)
+        for p in self.programs:
+            for c in p.criteria:
+                uses[c.node] += 1
+        return tuple(((node.criteria_type,), n) for node, n in zip(self.nodes, uses))
+
+
+def load_policy_snapshot(db: Session, version: int) -> PolicySnapshot:
+    # One pass over the three policy tables instead of 1 + L + P queries
+    lenders = db.query(Lender).filter(Lender.is_active == True).all()
+    lender_ids = [l.id for l in lenders]
+    programs = db.query(LenderProgram).filter(LenderProgram.lender_id.in_(lender_ids)).all() if lender_ids else []
+    program_ids = [p.id for p in programs]
+    criteria = db.query(PolicyCriteria).filter(PolicyCriteria.program_id.in_(program_ids)).all() if program_ids else []
+
+    # Identical conditions across programs collapse onto one shared node
+    node_ids: Dict[Any, int] = {}
+    nodes = []
+    criteria_by_program: Dict[str, list] = {}
+    for c in criteria:
+        key, check = _compile_stored(c)
+        node = node_ids.get(key)
+        if node is None:
+            node = node_ids[key] = len(nodes)
+            nodes.append(ConditionNode(criteria_type=c.criteria_type, operator=c.operator, value=c.value, check=check))
+        criteria_by_program.setdefault(c.program_id, []).append(
+            CriterionSnapshot(id=c.id, criteria_type=c.criteria_type, operator=c.operator, value=c.value,
+                              node=node, slot=SLOT.get(c.criteria_type), check=nodes[node].check)
+        )
+
+    programs_by_lender: Dict[str, list] = {}
+    for p in programs:
+        programs_by_lender.setdefault(p.lender_id, []).append(p)
+
+    snapshot_programs = []
+    for lender in lenders:
+        for p in programs_by_lender.get(lender.id, []):
+            program_criteria = tuple(criteria_by_program.get(p.id, []))
+            mask = 0
+            for c in program_criteria:
+                mask |= 1 << c.node
+            snapshot_programs.append(ProgramSnapshot(
+                id=p.id,
+                lender_id=lender.id,
+                lender_name=lender.name,
+                name=p.name,
+                min_loan_amount=p.min_loan_amount,
+                max_loan_amount=p.max_loan_amount,
+                criteria=program_criteria,
+                mask=mask,
+                policy_version=p.policy_version
+            ))
+
+    return PolicySnapshot(
+        version=version,
+        programs=tuple(snapshot_programs),
+        index=build_policy_index(snapshot_programs),
+        nodes=tuple(nodes)
+    )
+
+
+def _compile_stored(c: PolicyCriteria) -> Tuple[Any, Predicate]:
+    # New criteria are validated on write; rows that predate validation keep
+    # their old behaviour of never passing instead of failing the whole load.
+    try:
+        key = parse_criterion(c.criteria_type, c.operator, c.value)
+    except PolicyCompileError as e:
+        logger.warning("Policy criterion %s never matches: %s", c.id, e)
+        return None, never
+    return key, bind_predicate(*key)
+
+
+def read_policy_version(db) -> int:
+    """The shared catalog version; 0 if the row doesn't exist yet."""
+    return db.execute(select(PolicyCatalogVersion.version).where(PolicyCatalogVersion.id == 1)).scalar() or 0
+
+
+def bump_policy_version(db) -> None:
+    """Increment the shared catalog version inside the caller's transaction.
+
+    Every write to lenders, programs or criteria does this before it
+    commits, so other processes reload their snapshot on their next check.
+    ``db`` is a Session or a Connection.
+    """
+    result = db.execute(
+        update(PolicyCatalogVersion).where(PolicyCatalogVersion.id == 1)
+        .values(version=PolicyCatalogVersion.version + 1)
+    )
+    if not result.rowcount:
+        # Schemas created without the migration that seeds the row
+        db.execute(insert(PolicyCatalogVersion).values(id=1, version=2))
+
+
+_snapshot: Optional[PolicySnapshot] = None
+_snapshot_lock = threading.Lock()
+# When this process last compared _snapshot against the shared version
+_checked_at = 0.0
+
+
+def get_policy_snapshot(db: Session) -> PolicySnapshot:
+    """Return the current snapshot, reloading it when the shared version moved.
+
+    The shared version is read at most every POLICY_VERSION_CHECK_SECONDS,
+    so a policy write made by another worker process is picked up within
+    that interval; in between the snapshot is returned without a query.
+    """
+    global _checked_at
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - _checked_at < settings.POLICY_VERSION_CHECK_SECONDS:
+        return snapshot
+    with _snapshot_lock:
+        snapshot = _snapshot
+        # Another thread may have checked while this one waited for the lock
+        if snapshot is not None and time.monotonic() - _checked_at < settings.POLICY_VERSION_CHECK_SECONDS:
+            return snapshot
+        # Read before loading: a write landing in between leaves the snapshot
+        # labelled with the older version, so the next check reloads it
+        version = read_policy_version(db)
+        if snapshot is None or snapshot.version != version:
+            snapshot = _swap(load_policy_snapshot(db, version=version))
+        _checked_at = time.monotonic()
+    return snapshot
+
+
+def refresh_policy_snapshot(db: Session) -> PolicySnapshot:
+    """Rebuild the snapshot from the database and publish it atomically.
+
+    Call after committing a change to lenders, programs or criteria that
+    bumped the shared version (bump_policy_version). Other processes pick
+    the change up through get_policy_snapshot.
+    """
+    global _checked_at
+    with _snapshot_lock:
+        snapshot = _swap(load_policy_snapshot(db, version=read_policy_version(db)))
+        _checked_at = time.monotonic()
+        return snapshot
+
+
+def _swap(snapshot: PolicySnapshot) -> PolicySnapshot:
+    global _snapshot
+    _snapshot = snapshot
+    return snapshot
@@ -0,0 +1,79 @@
+"""Rejection codes stored in MatchResult.rejection_reasons.
+
+A rejected match stores one compact code per failed check rather than a
+message:
+
+    ["amount_min", 5000.0]      loan amount below the program minimum
+    ["amount_max", 900000.0]    loan amount above the program maximum
+    [<criterion id>, 640]       a policy criterion failed
+
+The second element is the value the application had: the loan amount, or
+the feature the criterion reads. Messages are only rendered when a response
+needs them, from the program and criteria the codes point at, and read
+exactly as the stored strings used to. Rows written before codes existed
+hold those strings and are passed through unchanged.
+"""
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from sqlalchemy.orm import Session
+
+from app.models.policy import PolicyCriteria
+from app.services.policy_snapshot import get_policy_snapshot
+
+AMOUNT_MIN = "amount_min"
+AMOUNT_MAX = "amount_max"
+_AMOUNT_CODES = (AMOUNT_MIN, AMOUNT_MAX)
+
+
+def render(codes: Optional[Sequence], program: Any, criteria: Mapping[str, Any]) -> List[str]:
+    """Messages for one match result.
+
+    ``program`` is anything with ``min_loan_amount``/``max_loan_amount`` (a
+    ProgramSnapshot or LenderProgram row), None if it was deleted;
+    ``criteria`` maps criterion id to anything with ``criteria_type``,
+    ``operator`` and ``value``.
+    """
+    messages = []
+    for code in codes or ():
+        if isinstance(code, str):
+            messages.append(code)
+            continue
+        key = code[0]
+        if key == AMOUNT_MIN:
+            messages.append(f"Loan amount too low (Min: {program.min_loan_amount})" if program
+                            else "Loan amount too low")
+        elif key == AMOUNT_MAX:
+            messages.append(f"Loan amount too high (Max: {program.max_loan_amount})" if program
+                            else "Loan amount too high")
+        else:
+            criterion = criteria.get(key)
+            # Criteria are replaced wholesale when a program's policies change;
+            # results pointing at old ones are re-scored in the background
+            messages.append(f"Failed {criterion.criteria_type} check: {criterion.operator} {criterion.value}"
+                            if criterion else "Failed a policy check that has since changed")
+    return messages
+
+
+def criterion_ids(code_lists: Iterable[Optional[Sequence]]) -> set:
+    return {
+        code[0]
+        for codes in code_lists for code in codes or ()
+        if not isinstance(code, str) and code[0] not in _AMOUNT_CODES
+    }
+
+
+def load_criteria(db: Session, code_lists: Iterable[Optional[Sequence]]) -> Dict[str, Any]:
+    """Criteria referenced by ``code_lists``, for render.
+
+    Served from the policy snapshot; only criteria it doesn't hold (those of
+    inactive lenders) cost a query.
+    """
+    ids = criterion_ids(code_lists)
+    if not ids:
+        return {}
+    known = get_policy_snapshot(db).criteria_by_id
+    found = {i: known[i] for i in ids if i in known}
+    missing = ids - found.keys()
+    if missing:
+        found.update({c.id: c for c in db.query(PolicyCriteria).filter(PolicyCriteria.id.in_(missing))})
+    return found
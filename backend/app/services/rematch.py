@@ -0,0 +1,292 @@
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, create_engine, distinct, func, pool, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.core.config import settings
+from app.models.business import Business
+from app.models.business_credit import BusinessCredit
+from app.models.loan import LoanRequest
+from app.models.match import MatchResult
+from app.models.personal_guarantor import PersonalGuarantor
+from app.services.batch_matching import match_batch
+from app.services.features import FeatureVector, extract_record_features
+from app.services.match_writer import bulk_insert_match_results
+from app.services.matching_engine import MatchingEngine
+from app.services.response_cache import response_cache
+from app.services.policy_snapshot import PolicySnapshot, get_policy_snapshot, load_policy_snapshot
+
+logger = logging.getLogger(__name__)
+
+# (loan_request_id, features) in,
+# (loan_request_id, [(program_id, lender_id, policy_version, eligible, fit_score, reasons)]) out
+Chunk = List[Tuple[str, FeatureVector]]
+ChunkResult = List[Tuple[str, List[tuple]]]
+
+
+@dataclass
+class RematchProgress:
+    total: int = 0
+    processed: int = 0
+    rows_written: int = 0
+    # Resume point: every loan request with an id <= this has been re-matched
+    last_loan_request_id: Optional[str] = None
+    started_at: float = field(default_factory=time.time)
+    finished: bool = False
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        elapsed = time.time() - self.started_at
+        return {
+            "total": self.total,
+            "processed": self.processed,
+            "rows_written": self.rows_written,
+            "last_loan_request_id": self.last_loan_request_id,
+            "elapsed_seconds": round(elapsed, 1),
+            "rate_per_second": round(self.processed / elapsed, 1) if elapsed else 0.0,
+            "finished": self.finished,
+            "error": self.error
+        }
+
+
+# Per-process snapshot, loaded once by the pool initializer
+_worker_snapshot: Optional[PolicySnapshot] = None
+
+
+def _init_worker(database_url: str):
+    global _worker_snapshot
+    engine = create_engine(database_url, poolclass=pool.NullPool)
+    db = sessionmaker(bind=engine)()
+    try:
+        _worker_snapshot = load_policy_snapshot(db, version=0)
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def _match_chunk(chunk: Chunk, snapshot: Optional[PolicySnapshot] = None) -> ChunkResult:
+    snapshot = snapshot or _worker_snapshot
+    batch = match_batch(snapshot, [features for _, features in chunk])
+    out = []
+    for i, (loan_request_id, _) in enumerate(chunk):
+        rows = []
+        for j, program in enumerate(snapshot.programs):
+            result = batch.result(i, j)
+            rows.append((program.id, program.lender_id, program.policy_version,
+                         result["eligible"], result["fit_score"], result["rejection_reasons"]))
+        out.append((loan_request_id, rows))
+    return out
+
+
+def _matchable(query, start_after: Optional[str], end_at: Optional[str]):
+    # Loan requests without a business or guarantor can't be matched. Loading and
+    # counting share these joins so progress.total is what a run actually processes.
+    query = (
+        query.select_from(LoanRequest)
+        .join(Business, Business.id == LoanRequest.business_id)
+        .join(PersonalGuarantor, PersonalGuarantor.business_id == Business.id)
+    )
+    if start_after is not None:
+        query = query.filter(LoanRequest.id > start_after)
+    if end_at is not None:
+        query = query.filter(LoanRequest.id <= end_at)
+    return query
+
+
+def _load_chunk(db: Session, start_after: Optional[str], end_at: Optional[str], size: int, as_of: datetime) -> Chunk:
+    query = _matchable(db.query(LoanRequest, Business, PersonalGuarantor, BusinessCredit), start_after, end_at).outerjoin(
+        BusinessCredit, BusinessCredit.business_id == Business.id
+    )
+
+    chunk = []
+    seen = set()
+    for loan_req, business, guarantor, credit in query.order_by(LoanRequest.id).limit(size):
+        if loan_req.id in seen:
+            continue
+        seen.add(loan_req.id)
+        chunk.append((loan_req.id, extract_record_features(business, guarantor, credit, loan_req, as_of)))
+    return chunk
+
+
+def _write_chunk(db: Session, chunk: Chunk, results: ChunkResult) -> int:
+    loan_request_ids = [loan_request_id for loan_request_id, _ in results]
+    db.query(MatchResult).filter(MatchResult.loan_request_id.in_(loan_request_ids)).delete(synchronize_session=False)
+    rows = [
+        {
+            "loan_request_id": loan_request_id,
+            "program_id": program_id,
+            "lender_id": lender_id,
+            "policy_version": policy_version,
+            "eligible": eligible,
+            "fit_score": fit_score,
+            "rejection_reasons": reasons
+        }
+        for loan_request_id, program_rows in results
+        for program_id, lender_id, policy_version, eligible, fit_score, reasons in program_rows
+    ]
+    written = bulk_insert_match_results(db, rows)
+    # Refresh the stored vectors that incremental re-matching reads
+    _store_features(db, chunk)
+    business_ids = [business_id for business_id, in
+                    db.query(LoanRequest.business_id).filter(LoanRequest.id.in_(loan_request_ids))]
+    db.commit()
+    response_cache.invalidate(business_ids)
+    return written
+
+
+def _store_features(db: Session, features: List[Tuple[str, FeatureVector]]):
+    if features:
+        db.execute(
+            update(LoanRequest.__table__).where(LoanRequest.__table__.c.id == bindparam("loan_request_id")),
+            [{"loan_request_id": loan_request_id, "features": list(fv)} for loan_request_id, fv in features]
+        )
+
+
+def count_loan_requests(db: Session, start_after: Optional[str] = None, end_at: Optional[str] = None) -> int:
+    return _matchable(db.query(func.count(distinct(LoanRequest.id))), start_after, end_at).scalar()
+
+
+def run_rematch(
+    db: Session,
+    workers: int = 4,
+    chunk_size: int = 500,
+    start_after: Optional[str] = None,
+    end_at: Optional[str] = None,
+    progress: Optional[RematchProgress] = None,
+    on_progress: Optional[Callable[[RematchProgress], None]] = None,
+    database_url: Optional[str] = None,
+) -> RematchProgress:
+    """Re-match stored loan requests against the current policies.
+
+    Loan requests are read in id order in chunks of ``chunk_size``; their
+    feature vectors are matched in a pool of ``workers`` processes that each
+    load the policy snapshot once, and results are written back here in bulk,
+    replacing the previous match results. Chunks are written in id order, so
+    ``progress.last_loan_request_id`` is always a safe ``start_after`` for
+    resuming an interrupted run. ``workers <= 1`` matches in this process.
+    """
+    progress = progress or RematchProgress()
+    progress.total = count_loan_requests(db, start_after, end_at)
+    as_of = datetime.now()
+    cursor = start_after
+
+    def record(chunk: Chunk, results: ChunkResult):
+        progress.rows_written += _write_chunk(db, chunk, results)
+        progress.processed += len(results)
+        progress.last_loan_request_id = results[-1][0]
+        if on_progress:
+            on_progress(progress)
+
+    try:
+        if workers <= 1:
+            snapshot = load_policy_snapshot(db, version=0)
+            while True:
+                chunk = _load_chunk(db, cursor, end_at, chunk_size, as_of)
+                if not chunk:
+                    break
+                cursor = chunk[-1][0]
+                record(chunk, _match_chunk(chunk, snapshot))
+        else:
+            url = database_url or settings.DATABASE_URL
+            # Spawned, not forked: a forked child would inherit this process's pooled
+            # connections and the locks of whatever threads (match workers) hold them
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker, initargs=(url,)) as executor:
+                # Bounded number of chunks in flight; results are consumed in submission order
+                in_flight = deque()
+                exhausted = False
+                while True:
+                    while not exhausted and len(in_flight) < workers * 2:
+                        chunk = _load_chunk(db, cursor, end_at, chunk_size, as_of)
+                        if not chunk:
+                            exhausted = True
+                            break
+                        cursor = chunk[-1][0]
+                        in_flight.append((chunk, executor.submit(_match_chunk, chunk)))
+                    if not in_flight:
+                        break
+                    chunk, future = in_flight.popleft()
+                    record(chunk, future.result())
+    except Exception as e:
+        db.rollback()
+        logger.exception("Re-match run failed after %s", progress.last_loan_request_id)
+        progress.error = str(e)
+        raise
+    finally:
+        progress.finished = True
+        if on_progress:
+            on_progress(progress)
+
+    return progress
+
+
+def rematch_program(db: Session, program_id: str, chunk_size: int = 1000) -> int:
+    """Re-score every stored application against one program only.
+
+    Reads each loan request's stored feature vector (backfilling it from the
+    application rows when missing) and replaces just this program's match
+    results, tagged with its current policy version. Other programs' rows are
+    left alone. Returns the number of loan requests re-scored.
+    """
+    snapshot = get_policy_snapshot(db)
+    program = next((p for p in snapshot.programs if p.id == program_id), None)
+    engine = MatchingEngine(db, snapshot)
+    as_of = datetime.now()
+    processed = 0
+    cursor = None
+
+    while True:
+        query = db.query(LoanRequest.id, LoanRequest.features, LoanRequest.business_id)
+        if cursor is not None:
+            query = query.filter(LoanRequest.id > cursor)
+        batch = query.order_by(LoanRequest.id).limit(chunk_size).all()
+        if not batch:
+            break
+        cursor = batch[-1][0]
+
+        features = {loan_request_id: tuple(fv) for loan_request_id, fv, _ in batch if fv is not None}
+        missing = [loan_request_id for loan_request_id, fv, _ in batch if fv is None]
+        if missing:
+            backfill = _load_features_for(db, missing, as_of)
+            _store_features(db, backfill)
+            features.update(backfill)
+
+        loan_request_ids = [loan_request_id for loan_request_id, _, _ in batch]
+        db.query(MatchResult).filter(
+            MatchResult.program_id == program_id,
+            MatchResult.loan_request_id.in_(loan_request_ids)
+        ).delete(synchronize_session=False)
+
+        # Inactive or deleted programs just lose their stale results
+        if program is not None:
+            bulk_insert_match_results(db, [
+                engine._match_row(loan_request_id, program, engine._evaluate_program(program, features[loan_request_id]))
+                for loan_request_id in loan_request_ids if loan_request_id in features
+            ])
+        db.commit()
+        response_cache.invalidate([business_id for _, _, business_id in batch])
+        processed += len(batch)
+
+    return processed
+
+
+def _load_features_for(db: Session, loan_request_ids: List[str], as_of: datetime) -> List[Tuple[str, FeatureVector]]:
+    rows = (
+        db.query(LoanRequest, Business, PersonalGuarantor, BusinessCredit)
+        .join(Business, Business.id == LoanRequest.business_id)
+        .join(PersonalGuarantor, PersonalGuarantor.business_id == Business.id)
+        .outerjoin(BusinessCredit, BusinessCredit.business_id == Business.id)
+        .filter(LoanRequest.id.in_(loan_request_ids))
+        .all()
+    )
+    features = {}
+    for loan_req, business, guarantor, credit in rows:
+        features.setdefault(loan_req.id, extract_record_features(business, guarantor, credit, loan_req, as_of))
+    return list(features.items())
@@ -0,0 +1,195 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+
+
+class CacheBackend:
+    """Storage behind ResponseCache. Values are JSON-compatible."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    def delete(self, keys: Iterable[str]):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process TTL + LRU store holding the response objects themselves."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, keys: Iterable[str]):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class LocalSharedBackend(MemoryBackend):
+    """Local stand-in for a shared cache such as Redis or memcached.
+
+    Values are stored as serialized JSON and decoded on every read, the way
+    a networked cache would hand them back, so callers can't come to rely on
+    getting the same object they stored.
+    """
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = super().get(key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float):
+        super().set(key, json.dumps(value), ttl)
+
+
+class ResponseCache:
+    """Read-through cache of per-application GET responses.
+
+    Entries are keyed by application (business) id and dropped by the code
+    paths that write that application's rows. A value loaded while an
+    invalidation happened is returned but not stored, so a read racing a
+    write can't put stale data back. Writes made by other processes (the
+    rematch.py CLI, seed scripts) are only seen once the TTL expires.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend], ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get_or_load(self, kind: str, application_id: str, load: Callable[[], Any]) -> Any:
+        if self.backend is None:
+            return load()
+        key = _key(kind, application_id)
+        value, generation = self._lookup(key)
+        if value is None:
+            value = load()
+            self._store(key, value, generation)
+        return value
+
+    async def get_or_load_async(self, kind: str, application_id: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """get_or_load for handlers that load through an async session."""
+        if self.backend is None:
+            return await load()
+        key = _key(kind, application_id)
+        value, generation = self._lookup(key)
+        if value is None:
+            value = await load()
+            self._store(key, value, generation)
+        return value
+
+    def invalidate(self, application_ids: Iterable[str]):
+        if self.backend is None:
+            return
+        keys = [_key(kind, application_id) for application_id in application_ids for kind in _KINDS]
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self.backend.delete(keys)
+
+    def clear(self):
+        if self.backend is None:
+            return
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            self.backend.clear()
+
+    def _lookup(self, key: str) -> Tuple[Optional[Any], int]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value, self._generation
+
+    def _store(self, key: str, value: Any, generation: int):
+        with self._lock:
+            if generation == self._generation:
+                self.backend.set(key, value, self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": type(self.backend).__name__ if self.backend else None,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+APPLICATION = "application"
+MATCHES = "matches"
+_KINDS = (APPLICATION, MATCHES)
+
+
+def _key(kind: str, application_id: str) -> str:
+    return f"{kind}:{application_id}"
+
+
+def _build_backend(name: str, max_size: int) -> Optional[CacheBackend]:
+    if name == "memory":
+        return MemoryBackend(max_size)
+    if name == "shared":
+        return LocalSharedBackend(max_size)
+    if name == "none":
+        return None
+    raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {name}")
+
+
+response_cache = ResponseCache(
+    _build_backend(settings.RESPONSE_CACHE_BACKEND, settings.RESPONSE_CACHE_SIZE),
+    ttl=settings.RESPONSE_CACHE_TTL
+)
+
+metrics.Callback("response_cache_hits", "Application response cache hits.", lambda: response_cache.hits, type="counter")
+metrics.Callback("response_cache_misses", "Application response cache misses.", lambda: response_cache.misses, type="counter")
+metrics.Callback("response_cache_hit_ratio", "Application response cache hits / lookups since start.",
+                 lambda: response_cache.stats()["hit_rate"])
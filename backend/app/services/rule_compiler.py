@@ -0,0 +1,126 @@
+import json
+import operator
+from typing import Any, Callable, Tuple
+from app.services.features import SLOT, FeatureVector
+
+Predicate = Callable[[FeatureVector], bool]
+
+NUMERIC_CRITERIA = frozenset({
+    "fico_score",
+    "years_in_business",
+    "annual_revenue",
+    "equipment_year",
+    "equipment_age",
+    "years_since_bankruptcy",
+    "paynet_score",
+    "trade_lines",
+})
+BOOLEAN_CRITERIA = frozenset({"bankruptcy"})
+TEXT_CRITERIA = frozenset({"industry", "state", "equipment_type"})
+
+COMPARISONS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_MEMBERSHIP = ("in", "not in")
+_EQUALITY = ("==", "!=")
+
+
+class PolicyCompileError(ValueError):
+    """Raised when a policy criterion cannot be turned into a predicate."""
+
+
+def parse_criterion(criteria_type: str, op: str, value: Any) -> Tuple[int, str, Any]:
+    """Validate and coerce one PolicyCriteria row.
+
+    Returns ``(slot, op, target)`` where numeric targets are floats, boolean
+    strings are bools and membership targets are frozensets.
+    """
+    if op not in COMPARISONS and op not in _MEMBERSHIP:
+        raise PolicyCompileError(f"Unsupported operator '{op}' for {criteria_type}")
+
+    if criteria_type in NUMERIC_CRITERIA:
+        coerce = _to_number
+    elif criteria_type in BOOLEAN_CRITERIA:
+        if op not in _EQUALITY and op not in _MEMBERSHIP:
+            raise PolicyCompileError(f"Operator '{op}' is not valid for boolean criterion {criteria_type}")
+        coerce = _to_bool
+    elif criteria_type in TEXT_CRITERIA:
+        if op not in _EQUALITY and op not in _MEMBERSHIP:
+            raise PolicyCompileError(f"Operator '{op}' is not valid for text criterion {criteria_type}")
+        coerce = _to_text
+    else:
+        raise PolicyCompileError(f"Unknown criteria type '{criteria_type}'")
+
+    try:
+        if op in _MEMBERSHIP:
+            target = frozenset(coerce(v) for v in _to_list(value))
+        else:
+            target = coerce(value)
+    except (TypeError, ValueError) as e:
+        raise PolicyCompileError(f"Invalid value {value!r} for {criteria_type} {op}: {e}") from None
+
+    return SLOT[criteria_type], op, target
+
+
+def compile_criterion(criteria_type: str, op: str, value: Any) -> Predicate:
+    """Compile one PolicyCriteria row into a predicate over a feature vector.
+
+    All coercion happens here, once (see parse_criterion). The returned
+    callable only reads its slot and does the bound comparison (missing
+    values fail).
+    """
+    return bind_predicate(*parse_criterion(criteria_type, op, value))
+
+
+def bind_predicate(slot: int, op: str, target: Any) -> Predicate:
+    """Build the predicate for an already parsed ``(slot, op, target)``."""
+    if op == "in":
+        return lambda fv: fv[slot] is not None and fv[slot] in target
+    if op == "not in":
+        return lambda fv: fv[slot] is not None and fv[slot] not in target
+
+    compare = COMPARISONS[op]
+    return lambda fv: fv[slot] is not None and compare(fv[slot], target)
+
+
+def never(fv: FeatureVector) -> bool:
+    """Predicate used for stored criteria that no longer compile."""
+    return False
+
+
+def _to_number(value: Any) -> float:
+    if isinstance(value, bool):
+        raise ValueError("expected a number, got a boolean")
+    if isinstance(value, (int, float)):
+        return value
+    return float(value)
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    raise ValueError("expected true or false")
+
+
+def _to_text(value: Any) -> str:
+    if not isinstance(value, str):
+        raise ValueError("expected a string")
+    return value
+
+
+def _to_list(value: Any) -> list:
+    # Values seeded as strings may hold a JSON encoded list
+    if isinstance(value, str):
+        value = json.loads(value)
+    if not isinstance(value, (list, tuple)):
+        raise ValueError("expected a list")
+    return list(value)
@@ -0,0 +1,89 @@
+"""Request throughput of the API with SQL echo off and on.
+
+Usage (from backend/):
+    python -m benchmarks.bench_echo [--requests 300] [--repeat 3] [--url ...]
+
+Drives POST /api/applications/submit?sync=true and GET /api/applications/{id}
+through the in-process ASGI client against the seeded lender catalog, once
+with DB_ECHO off and once with it on. Echoed statements go to /dev/null, so
+the difference is formatting and writing the log lines, not the terminal.
+Prints one JSON object with requests/second per mode.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _application(i):
+    return {
+        "business": {"name": f"Bench {i}", "industry": "Construction", "state": "TX",
+                     "years_in_business": 3 + i % 10, "annual_revenue": 250000 + 1000 * i},
+        "guarantor": {"fico_score": 640 + i % 150, "bankruptcy_flag": False},
+        "business_credit": {"paynet_score": 650 + i % 80, "trade_lines": 4},
+        "loan_request": {"amount": 20000 + 500 * (i % 200), "term_months": 36,
+                         "equipment_type": "Truck", "equipment_year": 2015 + i % 10},
+    }
+
+
+def _drive(client, count, offset):
+    start = time.perf_counter()
+    for i in range(offset, offset + count):
+        # Distinct applications, so the match cache doesn't hide the query cost
+        client.post("/api/applications/submit", params={"sync": "true"}, json=_application(i))
+    ids = [a["id"] for a in client.get("/api/applications/", params={"limit": count}).json()]
+    for application_id in ids:
+        client.get(f"/api/applications/{application_id}")
+    return (count + 1 + len(ids)) / (time.perf_counter() - start)
+
+
+def run(url, requests, repeat):
+    os.environ["DATABASE_URL"] = url
+    os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+    from fastapi.testclient import TestClient
+    from app.core.database import Base, async_engine, engine
+    from app.main import app as api
+    from app.models import business, business_credit, idempotency, loan, personal_guarantor  # noqa: F401
+    import seed_lenders
+
+    results = {"requests_per_run": requests, "repeat": repeat}
+    offset = 0
+    with TestClient(api) as client, open(os.devnull, "w") as devnull:
+        Base.metadata.create_all(engine)
+        with contextlib.redirect_stdout(devnull):
+            seed_lenders.setup_database_and_seed()
+        _drive(client, 20, offset)  # warm up snapshot and statement caches
+        offset += 20
+        for mode, echo in (("echo_off", False), ("echo_on", True)):
+            best = 0.0
+            for _ in range(repeat):
+                # The default echo handler binds sys.stdout when echo is switched on
+                with contextlib.redirect_stdout(devnull):
+                    engine.echo = echo
+                    async_engine.echo = echo
+                    best = max(best, _drive(client, requests, offset))
+                    engine.echo = False
+                    async_engine.echo = False
+                offset += requests
+            results[mode] = round(best, 1)
+    results["echo_overhead"] = round(results["echo_off"] / results["echo_on"] - 1, 3)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.url:
+        run(args.url, args.requests, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", args.requests, args.repeat)
@@ -0,0 +1,149 @@
+"""Measure get_application latency without and with the secondary indexes.
+
+Usage (from backend/):
+    python -m benchmarks.bench_indexes [--rows 1000000] [--programs 4] [--samples 200] [--url ...]
+
+Fills match_result with ``--rows`` rows (``--programs`` per application, so
+rows / programs applications), times the get_application query path with
+only primary keys, then creates the model indexes and times it again.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base
+from app.models.business import Business
+from app.models.business_credit import BusinessCredit
+from app.models.lender import Lender, LenderProgram
+from app.models.loan import LoanRequest
+from app.models.match import MatchResult
+from app.models.personal_guarantor import PersonalGuarantor
+from app.models.policy import PolicyCriteria
+from app.api.endpoints.application import APPLICATION_GRAPH, _application_response, _rejection_codes
+from app.services import rejections
+
+BATCH = 10000
+
+
+def _indexes():
+    return [index for table in Base.metadata.sorted_tables for index in table.indexes]
+
+
+def populate(engine, rows, programs, seed=7):
+    rnd = random.Random(seed)
+    lender_id = str(uuid.uuid4())
+    program_ids = [str(uuid.uuid4()) for _ in range(programs)]
+    # One FICO criterion per program, which rejected matches point at
+    criterion_ids = {pid: str(uuid.uuid4()) for pid in program_ids}
+    business_ids = []
+    with engine.begin() as conn:
+        conn.execute(insert(Lender.__table__), [{"id": lender_id, "name": "Bench Lender", "is_active": True}])
+        conn.execute(insert(LenderProgram.__table__), [
+            {"id": pid, "lender_id": lender_id, "name": f"Program {i}"} for i, pid in enumerate(program_ids)
+        ])
+        conn.execute(insert(PolicyCriteria.__table__), [
+            {"id": criterion_ids[pid], "program_id": pid, "criteria_type": "fico_score", "operator": ">=", "value": 680}
+            for pid in program_ids
+        ])
+
+    applications = rows // programs
+    for start in range(0, applications, BATCH):
+        n = min(BATCH, applications - start)
+        businesses, guarantors, credits, loans, matches = [], [], [], [], []
+        for _ in range(n):
+            bid, lid = str(uuid.uuid4()), str(uuid.uuid4())
+            business_ids.append(bid)
+            businesses.append({"id": bid, "name": "Bench Co", "industry": "Construction", "state": "TX",
+                               "years_in_business": rnd.randint(0, 20), "annual_revenue": 500000})
+            fico = rnd.randint(550, 820)
+            guarantors.append({"id": str(uuid.uuid4()), "business_id": bid, "fico_score": fico,
+                               "bankruptcy_flag": False, "collections_flag": False})
+            credits.append({"id": str(uuid.uuid4()), "business_id": bid, "paynet_score": 650, "trade_lines": 4})
+            loans.append({"id": lid, "business_id": bid, "amount": 50000, "term_months": 36})
+            for pid in program_ids:
+                eligible = rnd.random() < 0.3
+                matches.append({"id": str(uuid.uuid4()), "loan_request_id": lid, "lender_id": lender_id,
+                                "program_id": pid, "eligible": eligible, "fit_score": 100 if eligible else 0,
+                                "rejection_reasons": [] if eligible else [[criterion_ids[pid], fico]]})
+        with engine.begin() as conn:
+            conn.execute(insert(Business.__table__), businesses)
+            conn.execute(insert(PersonalGuarantor.__table__), guarantors)
+            conn.execute(insert(BusinessCredit.__table__), credits)
+            conn.execute(insert(LoanRequest.__table__), loans)
+            conn.execute(insert(MatchResult.__table__), matches)
+    return business_ids
+
+
+def time_get_application(SessionLocal, ids):
+    timings = []
+    for id in ids:
+        db = SessionLocal()
+        start = time.perf_counter()
+        business = db.query(Business).options(*APPLICATION_GRAPH).filter(Business.id == id).first()
+        _application_response(business, rejections.load_criteria(db, _rejection_codes([business])))
+        timings.append((time.perf_counter() - start) * 1000)
+        db.close()
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p99_ms": round(timings[int(len(timings) * 0.99) - 1], 3),
+        "mean_ms": round(statistics.fmean(timings), 3)
+    }
+
+
+def run(url, rows, programs, samples):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    for index in _indexes():
+        index.drop(engine)
+
+    start = time.perf_counter()
+    business_ids = populate(engine, rows, programs)
+    load_seconds = time.perf_counter() - start
+
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    ids = random.Random(11).sample(business_ids, min(samples, len(business_ids)))
+
+    before = time_get_application(SessionLocal, ids)
+    for index in _indexes():
+        index.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    after = time_get_application(SessionLocal, ids)
+    engine.dispose()
+
+    print(json.dumps({
+        "benchmark": "get_application_indexes",
+        "match_result_rows": len(business_ids) * programs,
+        "applications": len(business_ids),
+        "load_seconds": round(load_seconds, 1),
+        "without_indexes": before,
+        "with_indexes": after,
+        "speedup_p50": round(before["p50_ms"] / after["p50_ms"], 1)
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="match_result rows to generate")
+    parser.add_argument("--programs", type=int, default=4, help="programs (match rows) per application")
+    parser.add_argument("--samples", type=int, default=200, help="get_application calls per phase")
+    args = parser.parse_args()
+
+    if args.url:
+        run(args.url, args.rows, args.programs, args.samples)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", args.rows, args.programs, args.samples)
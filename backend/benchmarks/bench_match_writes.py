@@ -0,0 +1,120 @@
+"""Compare match result write paths: one ORM object per row vs one bulk insert.
+
+Usage (from backend/):
+    python -m benchmarks.bench_match_writes [--url sqlite:///bench.db] [--repeat 5]
+
+Defaults to a throwaway SQLite file; pass a PostgreSQL URL to measure there.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base
+from app.models import business, business_credit, loan, personal_guarantor, policy
+from app.models.lender import Lender, LenderProgram
+from app.models.loan import LoanRequest
+from app.models.match import MatchResult
+from app.services.match_writer import bulk_insert_match_results
+
+PROGRAM_COUNTS = (10, 100, 1000)
+# A failed criterion's rejection code (see app/services/rejections.py)
+CRITERION_ID = str(uuid.uuid4())
+
+
+def _seed_programs(db, count):
+    lender = Lender(name="Bench Lender", is_active=True)
+    db.add(lender)
+    db.flush()
+    programs = [LenderProgram(lender_id=lender.id, name=f"Program {i}") for i in range(count)]
+    db.add_all(programs)
+    db.flush()
+    loan_req = LoanRequest(amount=50000, term_months=36)
+    db.add(loan_req)
+    db.commit()
+    return lender, programs, loan_req
+
+
+def _rows(loan_request_id, lender, programs):
+    return [
+        {
+            "loan_request_id": loan_request_id,
+            "lender_id": lender.id,
+            "program_id": p.id,
+            "eligible": False,
+            "fit_score": 0,
+            "rejection_reasons": [[CRITERION_ID, 640]]
+        }
+        for p in programs
+    ]
+
+
+def orm_path(db, rows, lender, programs):
+    # Previous MatchingEngine behaviour: ORM objects with relationships, one INSERT each
+    by_id = {p.id: p for p in programs}
+    for row in rows:
+        db.add(MatchResult(
+            loan_request_id=row["loan_request_id"],
+            lender=lender,
+            program=by_id[row["program_id"]],
+            eligible=row["eligible"],
+            fit_score=row["fit_score"],
+            rejection_reasons=row["rejection_reasons"]
+        ))
+    db.commit()
+
+
+def bulk_path(db, rows, lender, programs):
+    bulk_insert_match_results(db, rows)
+    db.commit()
+
+
+def run(url, repeat):
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    print(f"{'programs':>9} {'orm rows/s':>12} {'bulk rows/s':>12} {'speedup':>8}")
+    for count in PROGRAM_COUNTS:
+        db = SessionLocal()
+        lender, programs, loan_req = _seed_programs(db, count)
+        lender_id, loan_request_id = lender.id, loan_req.id
+        db.close()
+
+        timings = {}
+        for name, path in (("orm", orm_path), ("bulk", bulk_path)):
+            best = float("inf")
+            for _ in range(repeat):
+                db = SessionLocal()
+                lender = db.get(Lender, lender_id)
+                programs = db.query(LenderProgram).filter(LenderProgram.lender_id == lender_id).all()
+                rows = _rows(loan_request_id, lender, programs)
+                start = time.perf_counter()
+                path(db, rows, lender, programs)
+                best = min(best, time.perf_counter() - start)
+                db.query(MatchResult).delete()
+                db.commit()
+                db.close()
+            timings[name] = count / best
+        print(f"{count:>9} {timings['orm']:>12.0f} {timings['bulk']:>12.0f} {timings['bulk'] / timings['orm']:>7.1f}x")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.url:
+        run(args.url, args.repeat)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", args.repeat)
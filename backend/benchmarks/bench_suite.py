@@ -0,0 +1,333 @@
+"""Offline benchmark suite for matching and the applications API.
+
+Usage (from backend/):
+    python -m benchmarks.bench_suite [--catalogs 10,100,1000,10000] [--listing-sizes 1000,10000,50000]
+                                     [--applications 500] [--evaluations 100] [--submits 200]
+                                     [--url ...] [--output results.json]
+
+Everything runs in process against a temporary SQLite file (or --url), with
+synthetic catalogs and application streams from benchmarks/synthetic.py.
+For each catalog size it measures:
+
+  * match_rows throughput (matching only, no database) and
+    evaluate_application throughput (matching plus persisting the results);
+  * memory per evaluation, via tracemalloc: peak allocation while matching
+    and bytes still held by the returned rows, plus the snapshot itself;
+  * POST /api/applications/submit?sync=true latency through the ASGI app.
+
+Then, for each listing size, it grows the application table to that many
+rows (with match rows against a small catalog) and times the first and a
+cursor page of GET /api/applications/, a filtered page and /count.
+
+The match and response caches are disabled so every request does the work.
+Prints (or writes) one JSON object; ids and data depend only on --seed, so
+two runs' outputs can be compared key by key.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _summary(samples):
+    """Latency summary in milliseconds."""
+    ordered = sorted(samples)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": pct(0.50),
+        "p90_ms": pct(0.90),
+        "p99_ms": pct(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _clear(conn, tables):
+    from sqlalchemy import delete
+    from app.core.database import Base
+    for name in tables:
+        conn.execute(delete(Base.metadata.tables[name]))
+
+
+APPLICATION_TABLES = ("match_result", "idempotency_key", "loan_request", "business_credit",
+                      "personal_guarantor", "business")
+CATALOG_TABLES = ("policy_criteria", "lender_program", "lender")
+
+
+def load_catalog(programs, seed):
+    """Replace the lender catalog (and every application) and publish a new snapshot."""
+    from app.core.database import SessionLocal, engine
+    from app.services.policy_snapshot import bump_policy_version, refresh_policy_snapshot
+    from benchmarks import synthetic
+
+    with engine.begin() as conn:
+        _clear(conn, APPLICATION_TABLES + CATALOG_TABLES)
+        synthetic.insert_rows(conn, synthetic.catalog_rows(programs, seed=seed))
+        bump_policy_version(conn)
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        snapshot = refresh_policy_snapshot(db)
+        snapshot_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return snapshot, snapshot_bytes
+    finally:
+        db.close()
+
+
+def bench_match(snapshot, payloads):
+    from app.schemas.application import ApplicationCreate
+    from app.services.features import extract_features
+    from app.services.matching_engine import MatchingEngine
+
+    engine = MatchingEngine(None, snapshot)
+    features = [extract_features(ApplicationCreate(**p)) for p in payloads]
+    engine.match_rows(features[0], "warmup")
+
+    start = time.perf_counter()
+    for i, fv in enumerate(features):
+        engine.match_rows(fv, str(i))
+    elapsed = time.perf_counter() - start
+
+    # tracemalloc slows allocation down a lot, so memory is a separate pass
+    sample = features[:50]
+    peaks, retained = [], []
+    tracemalloc.start()
+    for i, fv in enumerate(sample):
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        rows = engine.match_rows(fv, str(i))
+        current, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - base)
+        retained.append(current - base)
+        del rows
+    tracemalloc.stop()
+    return {
+        "applications": len(features),
+        "seconds": round(elapsed, 4),
+        "applications_per_second": round(len(features) / elapsed, 1),
+    }, {
+        "sampled": len(sample),
+        "peak_bytes_mean": round(statistics.fmean(peaks)),
+        "peak_bytes_max": max(peaks),
+        "result_bytes_mean": round(statistics.fmean(retained)),
+    }
+
+
+def bench_evaluate(payloads, seed):
+    from app.core.database import SessionLocal, engine
+    from app.schemas.application import ApplicationCreate
+    from app.services.matching_engine import MatchingEngine
+    from benchmarks import synthetic
+
+    rows = synthetic.application_rows(payloads, seed=seed)
+    with engine.begin() as conn:
+        synthetic.insert_rows(conn, rows)
+    apps = [ApplicationCreate(**p) for p in payloads]
+    loan_request_ids = [r["id"] for r in rows["loan_request"]]
+
+    db = SessionLocal()
+    try:
+        matcher = MatchingEngine(db)
+        start = time.perf_counter()
+        for app_data, loan_request_id in zip(apps, loan_request_ids):
+            matcher.evaluate_application(app_data, loan_request_id)
+        elapsed = time.perf_counter() - start
+    finally:
+        db.close()
+    return {
+        "applications": len(apps),
+        "seconds": round(elapsed, 4),
+        "applications_per_second": round(len(apps) / elapsed, 1),
+    }
+
+
+@contextlib.asynccontextmanager
+async def _client(api):
+    """In-process client for ``api``; each asyncio.run gets one."""
+    import httpx
+    from app.core.database import async_engine
+
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api), base_url="http://bench") as client:
+            yield client
+    finally:
+        # Pooled async connections belong to this event loop; the next run starts a new one
+        await async_engine.dispose()
+
+
+async def _timed_requests(api, requests):
+    """Run (method, url, kwargs) requests one at a time; returns latencies in seconds."""
+    latencies = []
+    async with _client(api) as client:
+        for method, url, kwargs in requests:
+            start = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+    return latencies
+
+
+def bench_submit(api, payloads, warmup=10):
+    requests = [("POST", "/api/applications/submit", {"params": {"sync": "true"}, "json": p}) for p in payloads]
+    latencies = asyncio.run(_timed_requests(api, requests))
+    return _summary(latencies[warmup:])
+
+
+def grow_applications(target, seed):
+    """Bulk insert applications (and their match rows) until there are ``target``."""
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import Session
+    from app.core.database import engine
+    from app.models.business import Business
+    from app.services.match_writer import bulk_insert_match_results
+    from app.services.matching_engine import MatchingEngine
+    from app.services.policy_snapshot import get_policy_snapshot
+    from benchmarks import synthetic
+
+    with Session(engine) as db:
+        have = db.scalar(select(func.count(Business.id)))
+        if have >= target:
+            return
+        matcher = MatchingEngine(None, get_policy_snapshot(db))
+        payloads = list(synthetic.application_payloads(target, seed=seed))[have:]
+        for i in range(0, len(payloads), 5000):
+            chunk = payloads[i:i + 5000]
+            # Later chunks get later created_at, so new rows land on the first page
+            rows = synthetic.application_rows(
+                chunk, seed=seed + have + i,
+                start=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=have + i))
+            synthetic.insert_rows(db.connection(), rows)
+            match_rows = []
+            for loan_request in rows["loan_request"]:
+                match_rows.extend(matcher.match_rows(tuple(loan_request["features"]), loan_request["id"]))
+            bulk_insert_match_results(db, match_rows)
+            db.commit()
+
+
+def bench_listing(api, repeat):
+    async def run():
+        async with _client(api) as client:
+            first = await client.get("/api/applications/", params={"limit": 100})
+            cursor = first.headers.get("x-next-cursor")
+            cases = {
+                "first_page": ("/api/applications/", {"limit": 100}),
+                "cursor_page": ("/api/applications/", {"limit": 100, "cursor": cursor}),
+                "filtered_page": ("/api/applications/", {"limit": 100, "state": "TX", "fico_min": 700}),
+                "count": ("/api/applications/count", {}),
+            }
+            if cursor is None:
+                # 100 applications or fewer fit on the first page; there is no second one to time
+                del cases["cursor_page"]
+            timings = {name: [] for name in cases}
+            for _ in range(repeat):
+                for name, (url, params) in cases.items():
+                    start = time.perf_counter()
+                    response = await client.get(url, params=params)
+                    timings[name].append(time.perf_counter() - start)
+                    response.raise_for_status()
+            return {name: _summary(samples) for name, samples in timings.items()}
+
+    return asyncio.run(run())
+
+
+def run(url, args):
+    os.environ["DATABASE_URL"] = url
+    # Caches would turn repeated work into lookups; the suite measures the work
+    os.environ["MATCH_CACHE_SIZE"] = "0"
+    os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+    import sqlalchemy
+    from app.core.database import Base, engine
+    from app.main import app as api
+    from app.models import business, business_credit, idempotency, loan, match, personal_guarantor, policy  # noqa: F401
+    from benchmarks import synthetic
+
+    Base.metadata.create_all(engine)
+    # Large catalogs make every match_result insert a "slow query"; that's the point here
+    logging.getLogger("app.db").setLevel(logging.ERROR)
+    results = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform(),
+            "dialect": engine.dialect.name,
+            "seed": args.seed,
+            "applications": args.applications,
+            "evaluations": args.evaluations,
+            "submits": args.submits,
+        },
+        "catalogs": [],
+        "listing": [],
+    }
+
+    for programs in args.catalogs:
+        print(f"catalog: {programs} programs", file=sys.stderr)
+        snapshot, snapshot_bytes = load_catalog(programs, args.seed)
+        match_throughput, memory = bench_match(
+            snapshot, list(synthetic.application_payloads(args.applications, seed=args.seed + 1)))
+        memory["snapshot_bytes"] = snapshot_bytes
+        evaluate_throughput = bench_evaluate(
+            list(synthetic.application_payloads(args.evaluations, seed=args.seed + 2)), seed=args.seed + 3)
+        submit = bench_submit(api, list(synthetic.application_payloads(args.submits + 10, seed=args.seed + 4)))
+        results["catalogs"].append({
+            "programs": programs,
+            "criteria": sum(len(p.criteria) for p in snapshot.programs),
+            "match_rows": match_throughput,
+            "evaluate_application": evaluate_throughput,
+            "memory_per_evaluation": memory,
+            "submit": submit,
+        })
+
+    load_catalog(args.listing_programs, args.seed)
+    for size in args.listing_sizes:
+        print(f"listing: {size} applications", file=sys.stderr)
+        grow_applications(size, seed=args.seed + 5)
+        results["listing"].append({"applications": size, **bench_listing(api, args.listing_repeat)})
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+def _sizes(text):
+    return [int(n) for n in text.split(",") if n]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="database URL (default: temporary SQLite file)")
+    parser.add_argument("--catalogs", type=_sizes, default=[10, 100, 1000, 10000], help="program counts")
+    parser.add_argument("--applications", type=int, default=500, help="applications per match_rows run")
+    parser.add_argument("--evaluations", type=int, default=100, help="applications per evaluate_application run")
+    parser.add_argument("--submits", type=int, default=200, help="timed submits per catalog")
+    parser.add_argument("--listing-sizes", type=_sizes, default=[1000, 10000, 50000], help="application counts")
+    parser.add_argument("--listing-programs", type=int, default=10, help="catalog size for the listing runs")
+    parser.add_argument("--listing-repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output", default=None, help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    if args.url:
+        run(args.url, args)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(f"sqlite:///{os.path.join(tmp, 'bench.db')}", args)
@@ -0,0 +1,196 @@
+"""Deterministic synthetic data for the benchmarks.
+
+Catalogs follow the shape of seed_lenders.py (a handful of programs per
+lender, each with a loan range and a few credit criteria) and application
+payloads look like what the frontend submits. The same seed always gives
+the same rows, ids included, so runs can be compared.
+"""
+import csv
+import io
+import json
+import random
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import insert
+
+from app.models.business import Business
+from app.models.business_credit import BusinessCredit
+from app.models.lender import Lender, LenderProgram
+from app.models.loan import LoanRequest
+from app.models.match import MatchResult
+from app.models.personal_guarantor import PersonalGuarantor
+from app.models.policy import PolicyCriteria
+from app.schemas.application import ApplicationCreate
+from app.services.features import extract_features
+
+INDUSTRIES = ("Construction", "Trucking", "Medical", "Retail", "Manufacturing", "Agriculture", "Restaurant")
+STATES = ("TX", "CA", "NY", "FL", "NV", "IL", "OH", "GA", "ND", "VT", "AZ", "WA")
+EQUIPMENT_TYPES = ("Truck", "Trailer", "Excavator", "Forklift", "MRI Scanner", "Tractor", "Oven")
+
+# (weight, criteria_type, operator, value factory). Weights follow how often
+# each rule appears in real credit boxes: nearly every program checks FICO,
+# time in business and bankruptcy history; fewer restrict geography or
+# industry.
+CRITERIA_MIX = (
+    (10, "fico_score", ">=", lambda r: r.choice([620, 650, 680, 700, 710, 720])),
+    (8, "years_in_business", ">=", lambda r: r.choice([1, 2, 3, 5])),
+    (7, "years_since_bankruptcy", ">=", lambda r: r.choice([5, 7, 10, 15])),
+    (4, "bankruptcy", "==", lambda r: False),
+    (4, "equipment_age", "<=", lambda r: r.choice([5, 10, 15])),
+    (4, "paynet_score", ">=", lambda r: r.choice([640, 660, 680])),
+    (3, "annual_revenue", ">=", lambda r: r.choice([100000, 250000, 500000])),
+    (3, "state", "not in", lambda r: r.sample(["CA", "NV", "ND", "VT"], 2)),
+    (2, "industry", "in", lambda r: r.sample(INDUSTRIES, 3)),
+    (1, "trade_lines", ">=", lambda r: r.choice([2, 3, 5])),
+)
+
+PROGRAMS_PER_LENDER = 4
+
+
+def _uuid(rnd: random.Random) -> str:
+    return str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+
+def catalog_rows(programs: int, seed: int = 11, criteria_per_program=(3, 6),
+                 lenders: Optional[int] = None) -> Dict[str, List[dict]]:
+    """Lender, program and criteria rows for a catalog of ``programs`` programs.
+
+    Programs are split evenly over ``lenders`` lenders (default: one per
+    PROGRAMS_PER_LENDER programs). ``criteria_per_program`` is a count or an
+    inclusive (min, max) range; at most len(CRITERIA_MIX). Returns
+    ``{table name: rows}`` in insert order.
+    """
+    rnd = random.Random(seed)
+    weights = [w for w, *_ in CRITERIA_MIX]
+    if isinstance(criteria_per_program, int):
+        criteria_per_program = (criteria_per_program, criteria_per_program)
+    lenders = lenders or -(-programs // PROGRAMS_PER_LENDER)
+    lender_rows = [{"id": _uuid(rnd), "name": f"Synthetic Lender {n}", "is_active": True} for n in range(lenders)]
+    program_rows, criteria_rows = [], []
+    tiers: Dict[str, int] = {}
+    for i in range(programs):
+        lender_id = lender_rows[i * lenders // programs]["id"]
+        tiers[lender_id] = tiers.get(lender_id, 0) + 1
+        program_id = _uuid(rnd)
+        program_rows.append({
+            "id": program_id,
+            "lender_id": lender_id,
+            "name": f"Tier {tiers[lender_id]}",
+            "min_loan_amount": rnd.choice([5000, 10000, 15000, 25000]),
+            "max_loan_amount": rnd.choice([75000, 150000, 250000, 500000]),
+        })
+        # Each criteria type at most once per program, as in seed_lenders.py
+        chosen, wanted = {}, rnd.randint(*criteria_per_program)
+        while len(chosen) < wanted:
+            _, criteria_type, operator, value = rnd.choices(CRITERIA_MIX, weights)[0]
+            chosen.setdefault(criteria_type, (operator, value(rnd)))
+        for criteria_type, (operator, value) in chosen.items():
+            criteria_rows.append({"id": _uuid(rnd), "program_id": program_id,
+                                  "criteria_type": criteria_type, "operator": operator, "value": value})
+    return {
+        Lender.__tablename__: lender_rows,
+        LenderProgram.__tablename__: program_rows,
+        PolicyCriteria.__tablename__: criteria_rows,
+    }
+
+
+def application_payloads(count: int, seed: int = 13) -> Iterator[dict]:
+    """ApplicationCreate-shaped dicts, as POSTed to /api/applications/submit."""
+    rnd = random.Random(seed)
+    for i in range(count):
+        bankrupt = rnd.random() < 0.1
+        payload = {
+            "business": {
+                "name": f"Synthetic Business {i}",
+                "industry": rnd.choice(INDUSTRIES),
+                "state": rnd.choice(STATES),
+                "years_in_business": rnd.randint(0, 25),
+                "annual_revenue": float(rnd.randint(50, 3000) * 1000),
+            },
+            "guarantor": {
+                "fico_score": min(850, max(300, int(rnd.gauss(690, 55)))),
+                "bankruptcy_flag": bankrupt,
+                "bankruptcy_date": (date(2024, 1, 1) - timedelta(days=rnd.randint(200, 7000))).isoformat()
+                if bankrupt else None,
+            },
+            "loan_request": {
+                "amount": float(rnd.randint(5, 400) * 1000),
+                "term_months": rnd.choice([24, 36, 48, 60]),
+                "equipment_type": rnd.choice(EQUIPMENT_TYPES),
+                "equipment_year": rnd.randint(2008, 2025),
+            },
+        }
+        # Some applicants have no business credit file
+        if rnd.random() < 0.8:
+            payload["business_credit"] = {"paynet_score": rnd.randint(600, 750), "trade_lines": rnd.randint(0, 12)}
+        yield payload
+
+
+def application_rows(payloads, seed: int = 17, start: datetime = datetime(2024, 1, 1, tzinfo=timezone.utc),
+                     spacing: timedelta = timedelta(minutes=1)) -> Dict[str, List[dict]]:
+    """Stored-application rows for ``payloads``, bypassing the API.
+
+    ``created_at`` advances by ``spacing`` per application so listing order
+    is stable. Loan requests carry their feature vector like submitted ones.
+    """
+    rnd = random.Random(seed)
+    rows = {table: [] for table in (Business.__tablename__, PersonalGuarantor.__tablename__,
+                                    BusinessCredit.__tablename__, LoanRequest.__tablename__)}
+    for i, payload in enumerate(payloads):
+        app_data = ApplicationCreate(**payload)
+        business_id = _uuid(rnd)
+        created_at = start + spacing * i
+        rows[Business.__tablename__].append({"id": business_id, "created_at": created_at, **app_data.business.model_dump()})
+        rows[PersonalGuarantor.__tablename__].append(
+            {"id": _uuid(rnd), "business_id": business_id, **app_data.guarantor.model_dump()})
+        if app_data.business_credit:
+            rows[BusinessCredit.__tablename__].append(
+                {"id": _uuid(rnd), "business_id": business_id, **app_data.business_credit.model_dump()})
+        rows[LoanRequest.__tablename__].append({
+            "id": _uuid(rnd), "business_id": business_id, "created_at": created_at,
+            "features": list(extract_features(app_data, as_of=created_at.replace(tzinfo=None))),
+            **app_data.loan_request.model_dump(),
+        })
+    return rows
+
+
+def insert_rows(conn, rows: Dict[str, List[dict]], batch_size: int = 5000):
+    """Write ``{table name: rows}`` on ``conn``, in order, inside its transaction.
+
+    One executemany INSERT per ``batch_size`` rows, or a single COPY per
+    table on PostgreSQL with psycopg2. Rows of one table must share the same keys.
+    """
+    tables = {model.__tablename__: model.__table__ for model in (
+        Lender, LenderProgram, PolicyCriteria, Business, PersonalGuarantor, BusinessCredit, LoanRequest, MatchResult)}
+    copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+    for table, table_rows in rows.items():
+        if not table_rows:
+            continue
+        if copy:
+            _copy_rows(conn, tables[table], table_rows)
+            continue
+        for i in range(0, len(table_rows), batch_size):
+            conn.execute(insert(tables[table]), table_rows[i:i + batch_size])
+
+
+def _copy_rows(conn, table, rows: List[dict]):
+    # CSV COPY: None is written as an unquoted empty field, which COPY reads as NULL
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def _copy_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
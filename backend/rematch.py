@@ -0,0 +1,55 @@
+import sys
+import os
+import argparse
+
+# Add parent dir to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.core.profiling import FORMATS, profiled
+from app.services.rematch import run_rematch
+
+def print_progress(progress):
+    p = progress.to_dict()
+    print(f"  {p['processed']}/{p['total']} loan requests, {p['rows_written']} match rows, "
+          f"{p['rate_per_second']}/s, last id {p['last_loan_request_id']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-match stored applications against the current lender policies.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="matching processes (1 = run in this process)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="loan requests per chunk")
+    parser.add_argument("--start-after", default=None, help="resume after this loan request id")
+    parser.add_argument("--end-at", default=None, help="stop after this loan request id (inclusive)")
+    parser.add_argument("--profile", choices=FORMATS, default=None,
+                        help="profile the run into PROFILING_DIR (use --workers 1 to include matching)")
+    args = parser.parse_args()
+
+    rematch = run_rematch
+    if args.profile:
+        rematch = profiled("rematch", format=args.profile)(run_rematch)
+        if args.workers > 1:
+            print("Note: matching runs in worker processes, which are not profiled.")
+
+    print(f"Re-matching with {args.workers} worker(s)...")
+    db = SessionLocal()
+    try:
+        progress = rematch(
+            db,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            start_after=args.start_after,
+            end_at=args.end_at,
+            on_progress=print_progress
+        )
+    except Exception as e:
+        print(f"Re-match failed: {e}")
+        print("Resume with --start-after <last id> shown above.")
+        sys.exit(1)
+    finally:
+        db.close()
+    print(f"Re-match complete: {progress.processed} loan requests, {progress.rows_written} match rows.")
+    if args.profile:
+        print(f"Profile written to {rematch.last_profile}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import sys
+import os
+import argparse
+import itertools
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import create_engine, delete, text
+from sqlalchemy.orm import Session
+
+# Add parent dir to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.models.business import Business
+from app.models.business_credit import BusinessCredit
+from app.models.idempotency import IdempotencyKey
+from app.models.lender import Lender, LenderProgram
+from app.models.loan import LoanRequest
+from app.models.match import MatchResult
+from app.models.personal_guarantor import PersonalGuarantor
+from app.models.policy import PolicyCriteria
+from app.services.batch_matching import match_batch
+from app.services.policy_snapshot import bump_policy_version, load_policy_snapshot
+from benchmarks import synthetic
+
+# Children first, so foreign keys are satisfied while clearing
+CLEAR_ORDER = (MatchResult, IdempotencyKey, LoanRequest, BusinessCredit, PersonalGuarantor, Business,
+               PolicyCriteria, LenderProgram, Lender)
+
+
+def clear(engine):
+    with engine.begin() as conn:
+        for model in CLEAR_ORDER:
+            conn.execute(delete(model.__table__))
+
+
+def seed_catalog(engine, args):
+    rows = synthetic.catalog_rows(args.programs, seed=args.seed, criteria_per_program=args.criteria,
+                                  lenders=args.lenders)
+    with engine.begin() as conn:
+        synthetic.insert_rows(conn, rows, batch_size=args.batch_size)
+        bump_policy_version(conn)
+    with Session(engine) as db:
+        return load_policy_snapshot(db, version=1)
+
+
+def match_rows(snapshot, application_rows, rnd):
+    """Historical match results for one chunk, as the engine would have stored them."""
+    loan_requests = application_rows[LoanRequest.__tablename__]
+    batch = match_batch(snapshot, [tuple(lr["features"]) for lr in loan_requests])
+    rows = []
+    for i, lr in enumerate(loan_requests):
+        for j, program in enumerate(snapshot.programs):
+            result = batch.result(i, j)
+            rows.append({
+                "id": str(uuid.UUID(int=rnd.getrandbits(128), version=4)),
+                "loan_request_id": lr["id"],
+                "lender_id": program.lender_id,
+                "program_id": program.id,
+                "policy_version": program.policy_version,
+                "eligible": result["eligible"],
+                "fit_score": result["fit_score"],
+                "rejection_reasons": result["rejection_reasons"],
+                "created_at": lr["created_at"],
+            })
+    return rows
+
+
+def seed_applications(engine, snapshot, args):
+    # Spread the history evenly over the last --days days, oldest first
+    end = datetime.now(timezone.utc).replace(microsecond=0)
+    spacing = timedelta(days=args.days) / max(args.applications, 1)
+    start = end - spacing * args.applications
+    payloads = synthetic.application_payloads(args.applications, seed=args.seed + 1)
+    rnd = random.Random(args.seed + 2)
+
+    written = {"applications": 0, "match_results": 0}
+    started = time.perf_counter()
+    for chunk_index in itertools.count():
+        chunk = list(itertools.islice(payloads, args.chunk_size))
+        if not chunk:
+            break
+        offset = chunk_index * args.chunk_size
+        rows = synthetic.application_rows(chunk, seed=args.seed + 3 + chunk_index,
+                                          start=start + spacing * offset, spacing=spacing)
+        if not args.no_matches:
+            rows[MatchResult.__tablename__] = match_rows(snapshot, rows, rnd)
+
+        # One transaction per chunk: a failed run keeps every finished chunk
+        with engine.begin() as conn:
+            synthetic.insert_rows(conn, rows, batch_size=args.batch_size)
+
+        written["applications"] += len(chunk)
+        written["match_results"] += len(rows.get(MatchResult.__tablename__, ()))
+        elapsed = time.perf_counter() - started
+        print(f"  {written['applications']}/{args.applications} applications, "
+              f"{written['match_results']} match results, "
+              f"{round(written['applications'] / elapsed)}/s")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a large synthetic lender catalog and application history.")
+    parser.add_argument("--url", default=None, help="database URL (default: DATABASE_URL)")
+    parser.add_argument("--lenders", type=int, default=25)
+    parser.add_argument("--programs", type=int, default=100, help="programs in total, split evenly over the lenders")
+    parser.add_argument("--criteria", type=int, default=4, help="criteria per program")
+    parser.add_argument("--applications", type=int, default=100000, help="historical applications")
+    parser.add_argument("--days", type=int, default=365, help="history spans this many days back from now")
+    parser.add_argument("--no-matches", action="store_true", help="skip match results")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="applications per transaction")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per INSERT statement (not used with COPY)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true",
+                        help="required: confirms every lender and application in the database is deleted first")
+    args = parser.parse_args()
+
+    if not args.reset:
+        parser.error("this replaces ALL lenders and applications in the target database; "
+                     "pass --reset to confirm")
+
+    if args.programs < args.lenders:
+        parser.error("--programs must be at least --lenders")
+    if not 1 <= args.criteria <= len(synthetic.CRITERIA_MIX):
+        parser.error(f"--criteria must be between 1 and {len(synthetic.CRITERIA_MIX)}")
+
+    # Expects a migrated schema (alembic upgrade head); everything in it is replaced
+    engine = create_engine(args.url or settings.DATABASE_URL)
+    started = time.perf_counter()
+
+    print(f"Clearing existing lender and application data in {engine.url.render_as_string(hide_password=True)}...")
+    clear(engine)
+
+    print(f"Seeding {args.lenders} lenders, {args.programs} programs, {args.criteria} criteria each...")
+    snapshot = seed_catalog(engine, args)
+
+    print(f"Seeding {args.applications} applications in chunks of {args.chunk_size}...")
+    written = seed_applications(engine, snapshot, args)
+
+    # Fresh statistics, so query plans reflect the new table sizes
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    print(f"Seeding complete in {time.perf_counter() - started:.1f}s: "
+          f"{written['applications']} applications, {written['match_results']} match results.")
+
+
+if __name__ == "__main__":
+    main()
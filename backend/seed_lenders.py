@@ -11,6 +11,7 @@ from app.core.config import settings
 from app.models.lender import Lender, LenderProgram
 from app.models.policy import PolicyCriteria
 from app.models.match import MatchResult
+from app.services.policy_snapshot import bump_policy_version
 
 def setup_database_and_seed():
     engine = create_engine(settings.DATABASE_URL)
@@ -124,6 +125,8 @@ def setup_database_and_seed():
     ]
     for p in policies: db.add(p)
 
+    # Running servers reload their policy snapshot on their next version check
+    bump_policy_version(db)
     db.commit()
     print("Seeding complete. Lenders added: Falcon, Advantage+, Credit Box Lender.")
     db.close()
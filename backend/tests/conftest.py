@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Settings are read at import time, so the test database is chosen before app is imported
+_db_dir = tempfile.mkdtemp(prefix="lender-matching-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{os.path.join(_db_dir, 'test.db')}"
+# The snapshot is loaded once per test session rather than re-checked mid-test
+os.environ["POLICY_VERSION_CHECK_SECONDS"] = "3600"
+os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def engine():
+    from app.core.database import Base, engine
+    from app.models import business, business_credit, idempotency, lender, loan, match, personal_guarantor, policy
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture(scope="session")
+def client(engine):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    with TestClient(app) as client:
+        yield client
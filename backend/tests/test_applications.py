@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.instrumentation import assert_max_queries
+from app.services.match_writer import bulk_insert_match_results
+from app.services.matching_engine import MatchingEngine
+from app.services.policy_snapshot import refresh_policy_snapshot
+from benchmarks import synthetic
+
+APPLICATIONS = 100
+
+
+@pytest.fixture(scope="module")
+def applications(engine):
+    """A small catalog and APPLICATIONS stored applications with their match results."""
+    with engine.begin() as conn:
+        synthetic.insert_rows(conn, synthetic.catalog_rows(20, seed=1))
+    with Session(engine) as db:
+        matcher = MatchingEngine(None, refresh_policy_snapshot(db))
+        rows = synthetic.application_rows(synthetic.application_payloads(APPLICATIONS, seed=2), seed=3)
+        synthetic.insert_rows(db.connection(), rows)
+        match_rows = []
+        for loan_request in rows["loan_request"]:
+            match_rows.extend(matcher.match_rows(tuple(loan_request["features"]), loan_request["id"]))
+        bulk_insert_match_results(db, match_rows)
+        db.commit()
+    return APPLICATIONS
+
+
+def test_list_query_count_does_not_grow_with_page_size(client, applications):
+    counts = {}
+    for limit in (1, 10, 100):
+        with assert_max_queries(5) as stats:
+            response = client.get("/api/applications/", params={"limit": limit})
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) == limit
+        assert all(len(application["matches"]) == 20 for application in page)
+        counts[limit] = stats.statements
+    assert counts[1] == counts[10] == counts[100], counts
@@ -0,0 +1,70 @@
+import pytest
+
+from app.core.database import SessionLocal
+from app.models.lender import Lender
+from app.services.policy_snapshot import bump_policy_version, refresh_policy_snapshot
+from benchmarks import synthetic
+
+PROGRAM = "Criterion Validation Program"
+
+
+@pytest.fixture(scope="module")
+def lender_id(client):
+    response = client.post("/api/lenders/", json={"name": "Criterion Validation Lender"})
+    assert response.status_code == 200
+    lender_id = response.json()["id"]
+    yield lender_id
+    # Deactivated so later modules see only the catalog they seed
+    with SessionLocal() as db:
+        db.query(Lender).filter(Lender.id == lender_id).update({Lender.is_active: False})
+        bump_policy_version(db)
+        db.commit()
+        refresh_policy_snapshot(db)
+
+
+def _programs(client, lender_id):
+    lender = next(l for l in client.get("/api/lenders/").json() if l["id"] == lender_id)
+    return [program["name"] for program in lender["programs"]]
+
+
+@pytest.mark.parametrize("criterion", [
+    {"criteria_type": "fico_score", "operator": "=>", "value": 700},
+    {"criteria_type": "fico_score", "operator": ">=", "value": "seven hundred"},
+    {"criteria_type": "state", "operator": ">", "value": "TX"},
+    {"criteria_type": "bankruptcy", "operator": "==", "value": "maybe"},
+    {"criteria_type": "industry", "operator": "in", "value": "Retail"},
+    {"criteria_type": "favourite_color", "operator": "==", "value": "blue"},
+])
+def test_program_with_invalid_criterion_is_rejected(client, lender_id, criterion):
+    response = client.post(f"/api/lenders/{lender_id}/programs", json={
+        "name": "Invalid Criterion Program",
+        "policies": [criterion],
+    })
+    assert response.status_code == 422, response.text
+    assert "Invalid Criterion Program" not in _programs(client, lender_id)
+
+
+def test_valid_criteria_still_match(client, lender_id):
+    response = client.post(f"/api/lenders/{lender_id}/programs", json={
+        "name": PROGRAM,
+        "min_loan_amount": 10000,
+        "max_loan_amount": 500000,
+        "policies": [
+            {"criteria_type": "fico_score", "operator": ">=", "value": 700},
+            {"criteria_type": "state", "operator": "in", "value": ["TX", "OK"]},
+        ],
+    })
+    assert response.status_code == 200, response.text
+
+    payload = next(synthetic.application_payloads(1, seed=5))
+    payload["business"]["state"] = "TX"
+    payload["loan_request"]["amount"] = 50000.0
+
+    def eligible_programs(fico_score):
+        payload["guarantor"]["fico_score"] = fico_score
+        response = client.post("/api/applications/eligible", json=payload)
+        assert response.status_code == 200, response.text
+        return [match["program_name"] for match in response.json()]
+
+    assert PROGRAM in eligible_programs(720)
+    assert PROGRAM not in eligible_programs(650)
@@ -106,7 +106,7 @@ def test_bankruptcy_logic():
     for name, data in scenarios:
         print(f"\n--- Testing: {name} ---")
         try:
-            response = requests.post(f"{API_URL}/api/applications/submit", json=data)
+            response = requests.post(f"{API_URL}/api/applications/submit", params={"sync": "true"}, json=data)
             if response.status_code == 200:
                 results = response.json()
                 for r in results:
@@ -8,7 +8,7 @@ const api = axios.create({
 });
 
 export const submitApplication = async (data: any) => {
-    const response = await api.post('/applications/submit', data);
+    const response = await api.post('/applications/submit', data, { params: { sync: true } });
     return response.data;
 };
 